@@ -0,0 +1,326 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+import configuration as config
+from core.erosion import erode_heightmap
+from core.mesh_export import export_terrain_mesh
+from models.mesh import Mesh
+from models.terrain import Terrain, TiledTerrain, compute_normal_map
+
+# Headless entry point: nothing below may import pygame, OpenGL or dearpygui
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger("TERRAIN")
+
+TIMING_FIELDS = ("terrain_ms", "erosion_ms", "mesh_ms", "write_ms", "total_ms")
+
+
+SEED_RANGE = re.compile(r"(-?\d+)(?:-(-?\d+))?")
+
+
+def parse_seeds(text):
+    """Parse a seed list such as "1-1000", "5,9,12", "1-10,20-30" or, with
+    negative seeds, "-5" and "-10--1"."""
+    seeds = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = SEED_RANGE.fullmatch(part)
+        if match is None:
+            raise ValueError(f"Invalid seed or seed range: {part!r}")
+        start, end = match.groups()
+        if end is None:
+            seeds.append(int(start))
+        elif int(end) < int(start):
+            raise ValueError(f"Empty seed range: {part!r}")
+        else:
+            seeds.extend(range(int(start), int(end) + 1))
+    return seeds
+
+
+def load_parameters(path):
+    """Read configuration overrides from a JSON file of {NAME: value}."""
+    if path is None:
+        return {}
+    with open(path) as f:
+        params = json.load(f)
+    unknown = sorted(name for name in params if not hasattr(config, name))
+    if unknown:
+        raise ValueError(f"Unknown configuration parameters: {', '.join(unknown)}")
+    return params
+
+
+def default_worker_count():
+    """Number of CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(params, numba_threads):
+    """Apply configuration overrides once per worker process."""
+    for name, value in params.items():
+        setattr(config, name, value)
+    if numba_threads:
+        import numba
+        numba.set_num_threads(min(numba_threads, numba.config.NUMBA_NUM_THREADS))
+
+
+def output_path(output_dir, seed, out_of_core=False):
+    """Where generate_seed (or generate_seed_out_of_core) writes `seed`."""
+    return os.path.join(output_dir, f"seed_{seed}" if out_of_core else f"seed_{seed}.npz")
+
+
+def generate_seed(seed, output_dir, write_mesh=True, compress=False, mesh_format=None):
+    """
+    Run the terrain, erosion and mesh pipeline for one seed and write the
+    result to `<output_dir>/seed_<seed>.npz`.
+
+    The archive holds the (eroded) heightmap, the uint8 biome map and, with
+    `write_mesh`, the normal map plus mesh vertices and indices. With a
+    `mesh_format` ("glb", "ply" or "obj") the mesh is also exported to
+    `<output_dir>/seed_<seed>.<mesh_format>`. Returns a dict of per-stage
+    timings in ms.
+    """
+    job_start = time.perf_counter()
+    config.HEIGHTMAP_BASE_SEED = seed
+
+    stage_start = time.perf_counter()
+    terrain = Terrain()
+    terrain_ms = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    heightmap, total_deposited, total_eroded = erode_heightmap(terrain.heightmap)
+    erosion_ms = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    arrays = {
+        "heightmap": heightmap,
+        "biome_map": terrain.biome_map,
+        "erosion_totals": np.array([total_deposited, total_eroded]),
+    }
+    if write_mesh:
+        mesh = Mesh()
+        mesh.build_grid(heightmap, config.HEIGHTMAP_SCALE)
+        arrays["normal_map"] = (
+            compute_normal_map(heightmap, dtype=heightmap.dtype) if config.SIMULATE_EROSION
+            else terrain.normal_map
+        )
+        arrays["vertices"] = mesh.vertices
+        arrays["indices"] = mesh.indices
+    mesh_ms = (time.perf_counter() - stage_start) * 1000
+
+    # Write under a temporary name so interrupted runs leave no partial files
+    stage_start = time.perf_counter()
+    path = output_path(output_dir, seed)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        (np.savez_compressed if compress else np.savez)(f, **arrays)
+    os.replace(temp_path, path)
+    size = os.path.getsize(path)
+    if write_mesh and mesh_format:
+        size += export_terrain_mesh(
+            os.path.join(output_dir, f"seed_{seed}.{mesh_format}"),
+            mesh, arrays["normal_map"], terrain.biome_map
+        )
+    write_ms = (time.perf_counter() - stage_start) * 1000
+
+    return {
+        "seed": seed,
+        "path": path,
+        "bytes": size,
+        "terrain_ms": terrain_ms,
+        "erosion_ms": erosion_ms,
+        "mesh_ms": mesh_ms,
+        "write_ms": write_ms,
+        "total_ms": (time.perf_counter() - job_start) * 1000,
+    }
+
+
+def generate_seed_out_of_core(seed, output_dir, write_mesh=False, compress=False, mesh_format=None):
+    """
+    Out-of-core counterpart of generate_seed for maps too large for RAM.
+
+    Streams a TiledTerrain into `<output_dir>/seed_<seed>/`, one .npy file
+    per layer, and erodes its heightmap in place with the seeded serial
+    kernel whatever EROSION_PARALLEL says (see TiledTerrain.erode), so the
+    result matches generate_seed only with EROSION_PARALLEL off. Meshes
+    and compression are not supported, so `write_mesh`, `compress` and
+    `mesh_format` are ignored. Returns a dict of per-stage timings in ms.
+    """
+    job_start = time.perf_counter()
+    config.HEIGHTMAP_BASE_SEED = seed
+
+    # Generate under a temporary name so interrupted runs leave no partial output
+    path = output_path(output_dir, seed, out_of_core=True)
+    temp_path = f"{path}.tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+
+    stage_start = time.perf_counter()
+    terrain = TiledTerrain(directory=temp_path)
+    terrain_ms = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    total_deposited, total_eroded = (
+        terrain.erode() if config.SIMULATE_EROSION else (0.0, 0.0)
+    )
+    np.save(os.path.join(temp_path, "erosion_totals.npy"), np.array([total_deposited, total_eroded]))
+    erosion_ms = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    size = terrain.nbytes
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(temp_path, path)
+    write_ms = (time.perf_counter() - stage_start) * 1000
+
+    return {
+        "seed": seed,
+        "path": path,
+        "bytes": size,
+        "terrain_ms": terrain_ms,
+        "erosion_ms": erosion_ms,
+        "mesh_ms": 0.0,
+        "write_ms": write_ms,
+        "total_ms": (time.perf_counter() - job_start) * 1000,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Generate terrains for a range of seeds without opening a window."
+    )
+    parser.add_argument("--seeds", required=True,
+                        help='seeds to generate, e.g. "1-1000" or "3,7,10-20" '
+                             '(negative seeds need --seeds=-10--1)')
+    parser.add_argument("--params",
+                        help="JSON file of configuration overrides, e.g. {\"HEIGHTMAP_WIDTH\": 256}")
+    parser.add_argument("--output", default="terrain_out",
+                        help="output directory (default: terrain_out)")
+    parser.add_argument("--workers", type=int, default=default_worker_count(),
+                        help="worker processes (default: one per available CPU)")
+    parser.add_argument("--numba-threads", type=int, default=1,
+                        help="Numba threads per worker (default: 1; 0 keeps Numba's default)")
+    parser.add_argument("--no-mesh", action="store_true",
+                        help="only write heightmaps and biome maps")
+    parser.add_argument("--compress", action="store_true",
+                        help="write compressed .npz archives")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="skip seeds whose output file already exists")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="stream each terrain into memory-mapped .npy layers under seed_<seed>/ "
+                             "(bounded by OUT_OF_CORE_TILE_MB; no mesh; always serial erosion)")
+    parser.add_argument("--export-mesh", choices=("glb", "ply", "obj"),
+                        help="also export each mesh with normals and biome colors to seed_<seed>.<format>")
+    return parser
+
+
+def summarize(results, wall_time):
+    """Log mean and 95th percentile of every timing field."""
+    if not results:
+        return
+    logger.info(
+        f"Generated {len(results)} terrains in {wall_time:.1f}s "
+        f"({len(results) / wall_time:.2f} terrains/s)"
+    )
+    for field in TIMING_FIELDS:
+        values = np.array([result[field] for result in results])
+        logger.info(
+            f"  {field[:-3]:<8} mean {values.mean():8.1f}ms | "
+            f"p95 {np.percentile(values, 95):8.1f}ms | max {values.max():8.1f}ms"
+        )
+
+
+def main(argv=None):
+    """ Batch generation entry point. """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        seeds = parse_seeds(args.seeds)
+        params = load_parameters(args.params)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.export_mesh and (args.no_mesh or args.out_of_core):
+        logger.warning(
+            f"--export-mesh is ignored with {'--out-of-core' if args.out_of_core else '--no-mesh'}, "
+            "which writes no mesh"
+        )
+
+    os.makedirs(args.output, exist_ok=True)
+    if args.skip_existing:
+        seeds = [
+            seed for seed in seeds
+            if not os.path.exists(output_path(args.output, seed, args.out_of_core))
+        ]
+    if not seeds:
+        logger.info("Nothing to generate")
+        return 0
+
+    workers = max(1, min(args.workers, len(seeds)))
+    logger.info(f"Generating {len(seeds)} seeds with {workers} worker processes into {args.output}")
+
+    results = []
+    failures = 0
+    batch_start = time.perf_counter()
+    summary_path = os.path.join(args.output, "summary.csv")
+    # A resumed run keeps the rows of the seeds it skips
+    resume = args.skip_existing and os.path.exists(summary_path) and os.path.getsize(summary_path) > 0
+    with open(summary_path, "a" if resume else "w", newline="") as summary_file, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(params, args.numba_threads)
+    ) as executor:
+        writer = csv.DictWriter(summary_file, fieldnames=("seed", "path", "bytes") + TIMING_FIELDS)
+        if not resume:
+            writer.writeheader()
+
+        generate = generate_seed_out_of_core if args.out_of_core else generate_seed
+        jobs = {
+            executor.submit(
+                generate, seed, args.output, not args.no_mesh, args.compress, args.export_mesh
+            ): seed
+            for seed in seeds
+        }
+        for job in as_completed(jobs):
+            seed = jobs[job]
+            try:
+                result = job.result()
+            except Exception as e:
+                failures += 1
+                logger.error(f"Seed {seed} failed: {e}")
+                continue
+
+            results.append(result)
+            writer.writerow(result)
+            summary_file.flush()
+            logger.info(
+                f"Seed {seed}: {result['total_ms']:.1f}ms "
+                f"(terrain {result['terrain_ms']:.1f} | erosion {result['erosion_ms']:.1f} | "
+                f"mesh {result['mesh_ms']:.1f} | write {result['write_ms']:.1f}) "
+                f"[{len(results) + failures}/{len(seeds)}]"
+            )
+
+    summarize(results, time.perf_counter() - batch_start)
+    logger.info(f"Per-job timings written to {summary_path}")
+    if failures:
+        logger.error(f"{failures} of {len(seeds)} seeds failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,358 @@
+import argparse
+import ctypes
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import time
+import numba
+import numpy as np
+
+import configuration as config
+from core.erosion import simulate_hydraulic_erosion_numba, simulate_hydraulic_erosion_parallel_numba
+from core.precision import PRECISIONS
+from core.terrain_generation import TerrainRenderer, compute_blinn_phong_intensities_numba
+import core.state as state
+import models.mesh
+import models.stats
+from models.terrain import Terrain, generate_climate_maps
+from utility import UtilityManager
+
+# Headless benchmark suite: nothing below may import pygame, OpenGL or dearpygui
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger("TERRAIN")
+
+RESOLUTIONS = (128, 256, 512, 1024, 2048, 4096)
+EROSION_ITERATIONS = (10000, 100000, 1000000)
+STAGES = ("heightmap", "normals", "climate", "biomes", "mesh", "erosion", "erosion_parallel", "lighting")
+SEED = 1
+
+
+def _read_status_kb(field):
+    """A memory field of /proc/self/status in kB, or None off Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_memory():
+    """Reset the peak resident set size so it can be measured per stage.
+    Returns False where the kernel does not support it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_memory_kb():
+    """Peak resident set size since the last reset (or process start)."""
+    peak = _read_status_kb("VmHWM")
+    if peak is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak
+
+
+def release_free_memory():
+    """Hand memory freed by earlier stages back to the OS (glibc only), so
+    a stage reusing it still shows up as resident set growth."""
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def current_memory_kb():
+    current = _read_status_kb("VmRSS")
+    return 0 if current is None else current
+
+
+def time_stage(fn, repeats):
+    """
+    Run `fn` once untimed (JIT compilation, first-touch page faults), then
+    `repeats` times. Returns the per-run times in ms and the peak memory in
+    MB the timed runs used on top of what was resident before them.
+    """
+    fn()
+    release_free_memory()
+    resident_before = current_memory_kb()
+    reset_peak_memory()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    peak_mb = max(peak_memory_kb() - resident_before, 0) / 1024
+    return times, peak_mb
+
+
+def configure_lighting():
+    """Normalized light and view directions, as StateManager sets them up."""
+    light_dir = np.array(config.LIGHTING_L_DIR, dtype=np.float64)
+    config.LIGHTING_L_DIR = light_dir / np.linalg.norm(light_dir)
+    config.LIGHTING_V_DIR = UtilityManager().get_camera_view_vec(
+        config.HEIGHTMAP_WIDTH, config.HEIGHTMAP_DEPTH, config.ELEVATION_VIEW
+    )
+
+
+def stage_cases(stage, terrain, renderer, iterations):
+    """(iterations, callable) pairs benchmarking `stage` on a terrain."""
+    if stage == "heightmap":
+        # Terrain._generateHeightmap also recomputes the normal map
+        return [(None, terrain._generateHeightmap)]
+    if stage == "normals":
+        return [(None, terrain._computeNormals)]
+    if stage == "climate":
+        return [(None, lambda: generate_climate_maps(terrain.heightmap))]
+    if stage == "biomes":
+        return [(None, terrain._assignBiomes)]
+    if stage == "mesh":
+        return [(None, lambda: renderer.generate_mesh(terrain.heightmap))]
+    if stage == "erosion":
+        return [
+            (count, lambda count=count: simulate_hydraulic_erosion_numba(
+                terrain.heightmap, count, config.EROSION_INIT_VELOCITY
+            ))
+            for count in iterations
+        ]
+    if stage == "erosion_parallel":
+        return [
+            (count, lambda count=count: simulate_hydraulic_erosion_parallel_numba(
+                terrain.heightmap, count, config.EROSION_INIT_VELOCITY, SEED,
+                config.EROSION_WORKERS or numba.get_num_threads(), config.EROSION_SYNC_ROUNDS
+            ))
+            for count in iterations
+        ]
+    if stage == "lighting":
+        normals = np.ascontiguousarray(terrain.normal_map)
+        return [(None, lambda: compute_blinn_phong_intensities_numba(
+            normals,
+            np.asarray(config.LIGHTING_L_DIR, dtype=normals.dtype),
+            np.asarray(config.LIGHTING_V_DIR, dtype=normals.dtype),
+            config.LIGHTING_K_AMB,
+            config.LIGHTING_K_DIFF,
+            config.LIGHTING_K_SPEC,
+            config.LIGHTING_SHIN
+        ))]
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def run_conditions():
+    """Settings that change every timing; only runs recorded under the same
+    conditions are comparable."""
+    return {"precision": config.PRECISION, "numba_threads": numba.get_num_threads()}
+
+
+def result_key(result):
+    return (
+        result["stage"], result["resolution"], result["iterations"],
+        result.get("precision"), result.get("numba_threads")
+    )
+
+
+def run_benchmarks(resolutions, stages, iterations, repeats):
+    """Benchmark every stage at every resolution. Returns a list of result
+    dicts with run times (ms) and peak memory (MB)."""
+    state.STATS = models.stats.Stats()
+    state.MESH = models.mesh.Mesh()
+    config.HEIGHTMAP_BASE_SEED = SEED
+    config.SIMULATE_EROSION = False
+    renderer = TerrainRenderer()
+
+    conditions = run_conditions()
+    results = []
+    for resolution in resolutions:
+        config.HEIGHTMAP_WIDTH = config.HEIGHTMAP_DEPTH = resolution
+        configure_lighting()
+        terrain = Terrain()
+
+        for stage in stages:
+            for count, fn in stage_cases(stage, terrain, renderer, iterations):
+                times, peak_mb = time_stage(fn, repeats)
+                result = {
+                    "stage": stage,
+                    "resolution": resolution,
+                    "iterations": count,
+                    "repeats": repeats,
+                    "median_ms": statistics.median(times),
+                    "min_ms": min(times),
+                    "max_ms": max(times),
+                    "peak_memory_mb": peak_mb,
+                    **conditions,
+                }
+                results.append(result)
+                label = stage if count is None else f"{stage} x{count}"
+                logger.info(
+                    f"{resolution:>5}² {label:<26} median {result['median_ms']:10.2f}ms | "
+                    f"min {result['min_ms']:10.2f}ms | peak mem {peak_mb:8.1f}MB"
+                )
+        state.MESH = models.mesh.Mesh()
+        del terrain
+    return results
+
+
+def _threading_layer():
+    try:
+        return numba.threading_layer()
+    except ValueError:
+        # No parallel kernel has run yet
+        return None
+
+
+def environment_info():
+    """Machine and library details stored alongside the results."""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "numba_threads": numba.get_num_threads(),
+        "numba_threading_layer": _threading_layer(),
+        "seed": SEED,
+        "precision": config.PRECISION,
+    }
+
+
+def baseline_mismatches(baseline):
+    """Run conditions under which `baseline` was recorded that differ from
+    the current ones, as {name: (baseline value, current value)}."""
+    recorded = baseline.get("environment", {})
+    return {
+        name: (recorded.get(name), value)
+        for name, value in run_conditions().items()
+        if recorded.get(name) != value
+    }
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Compare results with a baseline run of this script.
+
+    A case regresses when its median time, or its peak memory by more than
+    1 MB, exceeds the baseline by more than `threshold` (a fraction).
+    Cases are matched on stage, resolution, droplet count, precision and
+    thread count; cases missing from either run are skipped. Returns the
+    list of regressed cases as dicts with the time and memory ratios.
+    """
+    # Older baselines only record the run conditions in their environment
+    recorded = {name: baseline.get("environment", {}).get(name) for name in run_conditions()}
+    baseline_results = {
+        result_key({**recorded, **result}): result for result in baseline["results"]
+    }
+    regressions = []
+    for result in results:
+        previous = baseline_results.get(result_key(result))
+        if previous is None:
+            continue
+        time_ratio = result["median_ms"] / max(previous["median_ms"], 1e-9)
+        memory_growth = result["peak_memory_mb"] - previous["peak_memory_mb"]
+        memory_ratio = result["peak_memory_mb"] / max(previous["peak_memory_mb"], 1e-9)
+
+        slower = time_ratio > 1.0 + threshold
+        bigger = memory_growth > 1.0 and memory_ratio > 1.0 + threshold
+        status = "REGRESSION" if slower or bigger else ("faster" if time_ratio < 1.0 - threshold else "ok")
+        stage, resolution, count = result_key(result)[:3]
+        label = stage if count is None else f"{stage} x{count}"
+        logger.info(
+            f"{resolution:>5}² {label:<26} time x{time_ratio:5.2f} | "
+            f"memory {memory_growth:+8.1f}MB | {status}"
+        )
+        if slower or bigger:
+            regressions.append({
+                "stage": stage,
+                "resolution": resolution,
+                "iterations": count,
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+            })
+    return regressions
+
+
+def parse_list(text):
+    return [int(value) for value in text.split(",") if value.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark every terrain pipeline stage across resolutions."
+    )
+    parser.add_argument("--resolutions", type=parse_list, default=list(RESOLUTIONS),
+                        help="comma-separated square map sizes (default: 128,...,4096)")
+    parser.add_argument("--iterations", type=parse_list, default=list(EROSION_ITERATIONS),
+                        help="comma-separated erosion droplet counts (default: 10000,100000,1000000)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="timed runs per case after one warm-up run (default: 5)")
+    parser.add_argument("--precision", choices=PRECISIONS, default=config.PRECISION,
+                        help=f"float dtype of the pipeline (default: {config.PRECISION})")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON results file (default: benchmark_results.json)")
+    parser.add_argument("--baseline",
+                        help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown / memory growth before flagging a regression (default: 0.10)")
+    return parser
+
+
+def main(argv=None):
+    """ Benchmark entry point. Exits with 1 if regressions were found. """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}")
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+    config.PRECISION = args.precision
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"Cannot read baseline: {e}")
+        mismatches = baseline_mismatches(baseline)
+        if mismatches:
+            parser.error("Baseline was recorded under different conditions: " + ", ".join(
+                f"{name} {recorded} vs {current} now" for name, (recorded, current) in mismatches.items()
+            ) + "; rerun with matching --precision / NUMBA_NUM_THREADS")
+
+    if not reset_peak_memory():
+        logger.warning("Peak memory cannot be reset on this system; reporting process-wide peaks")
+
+    results = run_benchmarks(args.resolutions, stages, args.iterations, args.repeats)
+    report = {"environment": environment_info(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if baseline is None:
+        return 0
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        logger.error(f"{len(regressions)} regressions against {args.baseline}")
+        return 1
+    logger.info(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,6 +4,26 @@ WINDOW_FOV = 90
 WINDOW_CLIPPING_NEAR = 0.1
 WINDOW_CLIPPING_FAR = 1000.0
 ELEVATION_VIEW = 0.06
+RENDER_BACKEND = "VBO"  # "VBO" (buffer objects) or "IMMEDIATE" (glBegin/glEnd fallback)
+LOD_ENABLED = True      # geomipmapped level of detail for the terrain mesh
+LOD_PATCH_SIZE = 32     # cells per LOD patch side
+LOD_LEVELS = 4          # mip levels per patch (vertex strides 1, 2, 4, ...)
+LOD_PIXEL_ERROR = 1.0   # max projected height error in pixels before refining
+FRUSTUM_CULLING = True  # skip terrain patches outside the view frustum
+
+# STARTUP
+JIT_WARMUP = True       # compile Numba kernels in the background while the window opens
+STARTUP_TIMING = False  # log import, context and first-frame times (also: main.py --startup-timing)
+
+# PROFILING
+TRACE_SPANS = False         # record nested timing spans of generation stages and frame phases
+TRACE_BUFFER_SIZE = 4096    # most recent spans kept for Chrome trace export (ring buffer)
+FRAME_HISTORY = 300         # frames kept for frame-time percentiles and histogram
+FRAME_BUDGET_MS = 16.7      # frame time budget; slower frames count as over budget
+
+# PRECISION
+PRECISION = "float64"       # dtype of heightmap, erosion, normals, climate and shading: "float64" or "float32"
+DROP_CLIMATE_MAPS = False   # free temperature/moisture maps once biomes are assigned
 
 HEIGHTMAP_BASE_SEED = 1
 HEIGHTMAP_WIDTH = 100
@@ -12,16 +32,42 @@ HEIGHTMAP_SCALE = 10
 HEIGHTMAP_OCTAVES = 3
 HEIGHTMAP_PERSISTENCE = 0.5
 HEIGHTMAP_LACUNARITY = 2.0
+HEIGHTMAP_LAYER_CACHE_MB = 64   # octave layers kept so persistence changes only reweight; 0 disables
+
+# CHUNKED WORLD
+CHUNKED_WORLD = False       # stream an unbounded world of chunks instead of one fixed map
+CHUNK_SIZE = 64             # cells per chunk side
+CHUNK_VIEW_RADIUS = 2       # chunks kept loaded around the camera focus in each direction
+CHUNK_CACHE_SIZE = 49       # resident chunks (LRU); never fewer than the view area
+CHUNK_LOADS_PER_FRAME = 2   # new chunks generated per frame
+CAMERA_SPEED = 40.0         # chunked-world camera speed in cells per second (WASD / arrows)
+
+# OUT-OF-CORE
+OUT_OF_CORE_DIR = None      # directory for memmap layer files of TiledTerrain; None = new temporary directory
+OUT_OF_CORE_TILE_MB = 256   # working memory per tile of rows streamed by TiledTerrain
+
+# EXPORT
+EXPORT_FORMAT = "glb"       # mesh export format: "glb" (binary glTF), "ply" (binary PLY) or "obj"
+EXPORT_DIR = "."            # directory the UI writes exported meshes to
+EXPORT_CHUNK_SIZE = 1 << 18 # vertices / triangles written per block while streaming an export
+
+# TERRAIN CACHE
+TERRAIN_CACHE_SIZE = 8      # generated terrains kept in memory (LRU)
+TERRAIN_CACHE_DIR = None    # directory for persistent .npz entries; None disables
 
 # EROSION
 SIMULATE_EROSION = False
 EROSION_ITERATIONS = 100000
 EROSION_INIT_VELOCITY = 0.0
+EROSION_PARALLEL = True     # multi-core droplet batches (reproducible per seed + worker count)
+EROSION_WORKERS = 0         # droplet batches per round; 0 = one per Numba thread
+EROSION_SYNC_ROUNDS = 8     # how often parallel batches merge their changes
 
 #BIOME
 SIMULATE_BIOME = False
 BIOME_MOISTURE = 0.0
 BIOME_TEMPERATURE = 0.0
+CLIMATE_RESOLUTION = 0      # climate noise samples per axis, upsampled to the map; 0 = full resolution (e.g. 64 for large maps)
 BIOME_COLORS = {
     "TUNDRA": (0.9, 0.9, 1.0),
     "TAIGA": (0.3, 0.5, 0.3),
@@ -0,0 +1,200 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+import numpy as np
+
+import configuration as config
+from core.render_backend import create_render_backend, read_frustum_planes, resolve_render_backend
+from core.terrain_generation import VertexColorCache
+from core.terrain_lod import boxes_in_frustum
+from core.terrain_pipeline import record_stage_time
+from core.tracing import _span_tracer
+import models.mesh
+import models.terrain
+import core.state as state
+from core.precision import float_dtype
+
+logger = logging.getLogger("TERRAIN")
+
+
+class TerrainChunk:
+    """
+    One fixed-size tile of the infinite world.
+
+    Chunk (cx, cz) covers world cells [cx * CHUNK_SIZE, (cx + 1) * CHUNK_SIZE]
+    inclusive, so neighbouring chunks share their edge vertices. Holds the
+    tile's heightmap, normals, biome IDs and mesh, plus its own rendering
+    backend and shaded colors once uploaded.
+    """
+
+    def __init__(self, coords, heightmap, normal_map, biome_map, mesh):
+        self.coords = coords
+        self.heightmap = heightmap
+        self.normal_map = normal_map
+        self.biome_map = biome_map
+        self.mesh = mesh
+        # Axis-aligned bounding box for frustum culling
+        self.bounds = (mesh.vertices.min(axis=0), mesh.vertices.max(axis=0))
+        self.render_backend = None
+        self.color_cache = VertexColorCache()
+
+    @property
+    def nbytes(self):
+        return (
+            self.heightmap.nbytes + self.normal_map.nbytes + self.biome_map.nbytes +
+            self.mesh.vertices.nbytes + self.mesh.indices.nbytes
+        )
+
+    @staticmethod
+    def build(coords, size):
+        """
+        Generate a chunk's CPU-side layers from world-space noise.
+
+        The heightmap is sampled with a one-cell apron so normals along the
+        border use the same central differences as the neighbouring chunk.
+        """
+        x0, z0 = coords[0] * size, coords[1] * size
+        padded = models.terrain.generate_world_heightmap(
+            x0 - 1, z0 - 1, size + 3, size + 3, dtype=float_dtype()
+        )
+        heightmap = padded[1:-1, 1:-1]
+        normal_map = models.terrain.compute_normal_map(padded, dtype=padded.dtype)
+        normal_map = normal_map.reshape(size + 3, size + 3, 3)
+        normal_map = np.ascontiguousarray(normal_map[1:-1, 1:-1]).reshape(-1, 3)
+        _, _, biome_map = models.terrain.generate_world_climate_maps(
+            heightmap, x0, z0, assign_biomes=True
+        )
+
+        mesh = models.mesh.Mesh()
+        mesh.build_grid(heightmap, config.HEIGHTMAP_SCALE, origin=(x0, z0))
+        return TerrainChunk(coords, heightmap, normal_map, biome_map, mesh)
+
+    def upload(self):
+        """Create this chunk's rendering backend and upload its mesh."""
+        self.render_backend = create_render_backend(config.RENDER_BACKEND)
+        self.render_backend.upload_mesh(self.mesh.vertices, self.mesh.indices)
+        self.color_cache.invalidate()
+
+    def draw(self, terrain_renderer):
+        """Draw the chunk, re-shading it first if lighting changed."""
+        if not self.color_cache.is_valid():
+            colors = terrain_renderer.compute_vertex_colors(
+                self.normal_map, self.biome_map, self.mesh.vertices
+            )
+            self.color_cache.store(colors, self.normal_map, self.biome_map)
+            self.render_backend.upload_colors(colors)
+        self.render_backend.draw()
+
+    def release(self):
+        """Free the chunk's GPU buffers."""
+        if self.render_backend is not None:
+            self.render_backend.release()
+            self.render_backend = None
+
+
+class ChunkManager:
+    """
+    Streams terrain chunks around the camera.
+
+    Chunks within CHUNK_VIEW_RADIUS of the chunk under the camera's focus
+    point are generated lazily, nearest first and at most
+    CHUNK_LOADS_PER_FRAME per frame, and kept in an LRU of at most
+    CHUNK_CACHE_SIZE resident chunks. Evicted chunks release their GPU
+    buffers, so memory stays flat however far the camera travels.
+    Erosion is not applied to chunks, since droplets would cross seams.
+    """
+
+    def __init__(self, terrain_renderer, max_chunks=None):
+        self.terrain_renderer = terrain_renderer
+        self.max_chunks = config.CHUNK_CACHE_SIZE if max_chunks is None else max_chunks
+        self.chunks = OrderedDict()
+        self.visible = []
+        self.backend_name = resolve_render_backend(config.RENDER_BACKEND)
+
+    @staticmethod
+    def chunk_at(x, z):
+        """Integer coordinates of the chunk containing world point (x, z)."""
+        return (math.floor(x / config.CHUNK_SIZE), math.floor(z / config.CHUNK_SIZE))
+
+    @staticmethod
+    def coords_around(center, radius):
+        """Chunk coordinates within a square radius, nearest first."""
+        cx, cz = center
+        coords = [
+            (cx + dx, cz + dz)
+            for dx in range(-radius, radius + 1)
+            for dz in range(-radius, radius + 1)
+        ]
+        return sorted(coords, key=lambda c: (c[0] - cx) ** 2 + (c[1] - cz) ** 2)
+
+    def update(self, focus_x, focus_z):
+        """Load missing chunks around the focus point and evict old ones."""
+        if self.backend_name != resolve_render_backend(config.RENDER_BACKEND):
+            self.clear()
+            self.backend_name = resolve_render_backend(config.RENDER_BACKEND)
+
+        wanted = self.coords_around(self.chunk_at(focus_x, focus_z), config.CHUNK_VIEW_RADIUS)
+        capacity = max(self.max_chunks, len(wanted))
+
+        load_start = time.perf_counter()
+        loaded = 0
+        self.visible = []
+        for coords in wanted:
+            chunk = self.chunks.get(coords)
+            if chunk is None:
+                if loaded >= config.CHUNK_LOADS_PER_FRAME:
+                    continue
+                with _span_tracer.span("chunk build", coords=coords):
+                    chunk = TerrainChunk.build(coords, config.CHUNK_SIZE)
+                    chunk.upload()
+                self.chunks[coords] = chunk
+                loaded += 1
+            self.chunks.move_to_end(coords)
+            self.visible.append(chunk)
+
+        while len(self.chunks) > capacity:
+            _, evicted = self.chunks.popitem(last=False)
+            evicted.release()
+
+        if loaded:
+            state.STATS.CHUNKS_LOADED += loaded
+            record_stage_time("chunks", (time.perf_counter() - load_start) * 1000)
+        state.STATS.CHUNKS_RESIDENT = len(self.chunks)
+
+    def render(self):
+        """Draw every resident chunk around the current focus point that
+        lies inside the view frustum."""
+        chunks = self.visible
+        if config.FRUSTUM_CULLING and chunks:
+            low = np.array([chunk.bounds[0] for chunk in chunks], dtype=np.float64)
+            high = np.array([chunk.bounds[1] for chunk in chunks], dtype=np.float64)
+            inside = boxes_in_frustum(read_frustum_planes(), low, high)
+            chunks = [chunk for chunk, keep in zip(chunks, inside) if keep]
+
+        vertex_count = 0
+        triangle_count = 0
+        for chunk in chunks:
+            chunk.draw(self.terrain_renderer)
+            vertex_count += chunk.mesh.vertex_count
+            triangle_count += chunk.mesh.triangle_count
+        state.STATS.VERTEX_COUNT = vertex_count
+        state.STATS.TRIANGLE_COUNT = triangle_count
+        state.STATS.PATCHES_DRAWN = len(chunks)
+        state.STATS.PATCHES_CULLED = len(self.visible) - len(chunks)
+
+    @property
+    def nbytes(self):
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+    def clear(self):
+        """Drop all chunks, e.g. after generation parameters changed."""
+        for chunk in self.chunks.values():
+            chunk.release()
+        self.chunks.clear()
+        self.visible = []
+        state.STATS.CHUNKS_RESIDENT = 0
+
+    def release(self):
+        """Release all GPU resources held by resident chunks."""
+        self.clear()
@@ -71,7 +71,7 @@ class UIManager:
         dpg.create_viewport(
             title="TERRAIN CONTROLS", 
             width=400, 
-            height=600
+            height=900
         )
         dpg.setup_dearpygui()
         dpg.show_viewport()
@@ -0,0 +1,284 @@
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+import configuration as config
+
+
+def erode_heightmap(heightmap):
+    """
+    Apply hydraulic erosion with the configured kernel and parameters.
+
+    Returns (heightmap, total_deposited, total_eroded); the input heightmap
+    is returned unchanged with zero totals when erosion is disabled.
+    """
+    if not config.SIMULATE_EROSION:
+        return heightmap, 0.0, 0.0
+    if config.EROSION_PARALLEL:
+        return simulate_hydraulic_erosion_parallel_numba(
+            heightmap, 
+            iterations=config.EROSION_ITERATIONS,
+            initial_velocity=config.EROSION_INIT_VELOCITY,
+            seed=config.HEIGHTMAP_BASE_SEED,
+            num_workers=config.EROSION_WORKERS or get_num_threads(),
+            sync_rounds=config.EROSION_SYNC_ROUNDS
+        )
+    return simulate_hydraulic_erosion_numba(
+        heightmap, 
+        iterations=config.EROSION_ITERATIONS,
+        initial_velocity=config.EROSION_INIT_VELOCITY,
+        seed=config.HEIGHTMAP_BASE_SEED
+    )
+
+
+@njit(nogil=True, cache=True)
+def simulate_hydraulic_erosion_numba(heightmap, iterations=1000000, 
+                                   initial_velocity=0.0, erosion_radius=3, seed=0):
+    """
+    Simulate hydraulic erosion using water droplet physics.
+    
+    Optimized using Numba JIT compilation for performance. Simulates
+    water droplets flowing across the terrain, carrying and depositing
+    sediment based on velocity and slope.
+    
+    Args:
+        heightmap (numpy.ndarray): Input terrain heightmap to erode
+        iterations (int): Number of water droplets to simulate
+        initial_velocity (float): Starting velocity for droplets
+        erosion_radius (int): Influence radius for erosion effects
+        seed (int): Seed for the droplet random stream
+    """
+    eroded_map = heightmap.copy()
+    total_deposited, total_eroded = erode_in_place_numba(eroded_map, iterations, initial_velocity, seed)
+    return eroded_map, total_deposited, total_eroded
+
+
+@njit(nogil=True, cache=True)
+def erode_in_place_numba(eroded_map, iterations, initial_velocity, seed=0):
+    """
+    Droplet loop of simulate_hydraulic_erosion_numba, writing straight into
+    `eroded_map`. Also accepts np.memmap heightmaps, so out-of-core terrains
+    erode without an in-memory copy.
+    
+    Args:
+        eroded_map (numpy.ndarray): Heightmap to erode in place
+        iterations (int): Number of water droplets to simulate
+        initial_velocity (float): Starting velocity for droplets
+        seed (int): Seed for the droplet random stream
+    
+    Returns:
+        (total_deposited, total_eroded)
+    """
+    width, height = eroded_map.shape
+    total_deposited = 0.0
+    total_eroded = 0.0
+    
+    np.random.seed(_mix_erosion_seed(seed, 0))
+    for _ in range(iterations):
+        x, y = np.random.randint(0, width), np.random.randint(0, height)
+        droplet_velocity = initial_velocity
+        droplet_sediment = 0.0
+        droplet_water = 1.0
+        
+        # Simulate droplet lifetime for random droplet
+        for _ in range(30):  # Maximum droplet lifetime steps
+            x_int, y_int = int(x), int(y)
+            
+            # Calculate terrain gradient using bilinear interpolation
+            if x_int < 0 or x_int >= width - 1 or y_int < 0 or y_int >= height - 1:
+                gradient_x = 0.0
+                gradient_y = 0.0
+            else:
+                # Bilinear interpolation for smooth gradients
+                x_frac, y_frac = x - x_int, y - y_int
+                h00 = eroded_map[x_int, y_int]
+                h10 = eroded_map[x_int + 1, y_int]
+                h01 = eroded_map[x_int, y_int + 1]
+                h11 = eroded_map[x_int + 1, y_int + 1]
+                
+                gradient_x = (h10 - h00) * (1 - y_frac) + (h11 - h01) * y_frac
+                gradient_y = (h01 - h00) * (1 - x_frac) + (h11 - h10) * x_frac
+
+                gradient_x = max(-10.0, min(10.0, gradient_x))
+                gradient_y = max(-10.0, min(10.0, gradient_y))
+
+            gradient_magnitude = max(1e-6, np.sqrt(gradient_x**2 + gradient_y**2))
+            
+            # Stop if no gradient (flat area)
+            if gradient_x == 0.0 and gradient_y == 0.0:
+                break
+                
+            # Move droplet down gradient
+            x -= gradient_x / gradient_magnitude
+            y -= gradient_y / gradient_magnitude
+
+            if x < 0 or x >= width or y < 0 or y >= height:
+                break
+                
+            x_int, y_int = int(x), int(y)
+            slope = np.sqrt(gradient_x**2 + gradient_y**2)
+            
+            # Calculate sediment carrying capacity
+            carrying_capacity = droplet_velocity * droplet_water * slope * 0.1
+            
+            # Deposit or erode based on capacity
+            if droplet_sediment > carrying_capacity or eroded_map[x_int, y_int] < 0.0:
+                deposit_amount = max(0.0, (droplet_sediment - carrying_capacity) * 0.3)
+                eroded_map[x_int, y_int] += deposit_amount
+                droplet_sediment -= deposit_amount
+                total_deposited += deposit_amount
+            else:
+                max_erosion = eroded_map[x_int, y_int] * 0.99
+                erode_amount = min((carrying_capacity - droplet_sediment) * 0.3, max_erosion)
+                eroded_map[x_int, y_int] -= erode_amount
+                droplet_sediment += erode_amount
+                total_eroded += erode_amount
+
+            droplet_velocity = max(0.0, droplet_velocity + slope - 0.1)
+            droplet_water *= 0.99  # Evaporation
+    
+    return total_deposited, total_eroded
+
+@njit(cache=True)
+def _mix_erosion_seed(seed, stream):
+    """Derive an independent 32-bit RNG seed for one droplet batch."""
+    mixed = (seed * 0x9E3779B1 + stream * 0x85EBCA77 + 0x165667B1) & 0xFFFFFFFF
+    mixed ^= mixed >> 15
+    mixed = (mixed * 0x2C1B3C6D) & 0xFFFFFFFF
+    mixed ^= mixed >> 13
+    return mixed
+
+
+@njit(cache=True)
+def _simulate_droplet_numba(base_map, delta_map, x, y, initial_velocity):
+    """
+    Trace a single droplet over `base_map + delta_map`, writing its erosion
+    and deposition into `delta_map` only.
+    
+    Mirrors the droplet physics of simulate_hydraulic_erosion_numba.
+    Returns the (deposited, eroded) sediment totals for the droplet.
+    """
+    width, height = base_map.shape
+    droplet_velocity = initial_velocity
+    droplet_sediment = 0.0
+    droplet_water = 1.0
+    deposited = 0.0
+    eroded = 0.0
+    
+    for _ in range(30):  # Maximum droplet lifetime steps
+        x_int, y_int = int(x), int(y)
+        
+        # Calculate terrain gradient using bilinear interpolation
+        if x_int < 0 or x_int >= width - 1 or y_int < 0 or y_int >= height - 1:
+            gradient_x = 0.0
+            gradient_y = 0.0
+        else:
+            x_frac, y_frac = x - x_int, y - y_int
+            h00 = base_map[x_int, y_int] + delta_map[x_int, y_int]
+            h10 = base_map[x_int + 1, y_int] + delta_map[x_int + 1, y_int]
+            h01 = base_map[x_int, y_int + 1] + delta_map[x_int, y_int + 1]
+            h11 = base_map[x_int + 1, y_int + 1] + delta_map[x_int + 1, y_int + 1]
+            
+            gradient_x = (h10 - h00) * (1 - y_frac) + (h11 - h01) * y_frac
+            gradient_y = (h01 - h00) * (1 - x_frac) + (h11 - h10) * x_frac
+            
+            gradient_x = max(-10.0, min(10.0, gradient_x))
+            gradient_y = max(-10.0, min(10.0, gradient_y))
+        
+        gradient_magnitude = max(1e-6, np.sqrt(gradient_x**2 + gradient_y**2))
+        
+        # Stop if no gradient (flat area)
+        if gradient_x == 0.0 and gradient_y == 0.0:
+            break
+        
+        # Move droplet down gradient
+        x -= gradient_x / gradient_magnitude
+        y -= gradient_y / gradient_magnitude
+        
+        if x < 0 or x >= width or y < 0 or y >= height:
+            break
+        
+        x_int, y_int = int(x), int(y)
+        slope = np.sqrt(gradient_x**2 + gradient_y**2)
+        current_height = base_map[x_int, y_int] + delta_map[x_int, y_int]
+        
+        # Calculate sediment carrying capacity
+        carrying_capacity = droplet_velocity * droplet_water * slope * 0.1
+        
+        # Deposit or erode based on capacity
+        if droplet_sediment > carrying_capacity or current_height < 0.0:
+            deposit_amount = max(0.0, (droplet_sediment - carrying_capacity) * 0.3)
+            delta_map[x_int, y_int] += deposit_amount
+            droplet_sediment -= deposit_amount
+            deposited += deposit_amount
+        else:
+            max_erosion = current_height * 0.99
+            erode_amount = min((carrying_capacity - droplet_sediment) * 0.3, max_erosion)
+            delta_map[x_int, y_int] -= erode_amount
+            droplet_sediment += erode_amount
+            eroded += erode_amount
+        
+        droplet_velocity = max(0.0, droplet_velocity + slope - 0.1)
+        droplet_water *= 0.99  # Evaporation
+    
+    return deposited, eroded
+
+
+@njit(parallel=True, nogil=True, cache=True)
+def simulate_hydraulic_erosion_parallel_numba(heightmap, iterations=1000000,
+                                              initial_velocity=0.0, seed=0,
+                                              num_workers=4, sync_rounds=8):
+    """
+    Simulate hydraulic erosion with droplet batches spread over all cores.
+    
+    Droplets are split into `sync_rounds` rounds of `num_workers` batches.
+    Within a round every batch runs in parallel against the heightmap
+    frozen at the start of the round and accumulates its changes in a
+    private delta map, so no two threads ever write the same cell. The
+    deltas are then merged in batch order. Each batch reseeds its own
+    random stream from (seed, round, batch), making the result
+    reproducible for a given seed and worker count regardless of how
+    Numba schedules batches onto threads.
+    
+    Args:
+        heightmap (numpy.ndarray): Input terrain heightmap to erode
+        iterations (int): Total number of water droplets to simulate
+        initial_velocity (float): Starting velocity for droplets
+        seed (int): Seed for the per-batch random streams
+        num_workers (int): Droplet batches per round (usually thread count)
+        sync_rounds (int): Number of merge points between batches
+    """
+    eroded_map = heightmap.copy()
+    width, height = eroded_map.shape
+    num_workers = max(1, num_workers)
+    sync_rounds = max(1, sync_rounds)
+    
+    delta_maps = np.zeros((num_workers, width, height), dtype=heightmap.dtype)
+    deposited = np.zeros(num_workers)
+    eroded = np.zeros(num_workers)
+    num_batches = num_workers * sync_rounds
+    
+    for round_index in range(sync_rounds):
+        for worker in prange(num_workers):
+            batch = round_index * num_workers + worker
+            batch_size = iterations // num_batches
+            if batch < iterations % num_batches:
+                batch_size += 1
+            
+            np.random.seed(_mix_erosion_seed(seed, batch))
+            delta_map = delta_maps[worker]
+            for _ in range(batch_size):
+                x, y = np.random.randint(0, width), np.random.randint(0, height)
+                batch_deposited, batch_eroded = _simulate_droplet_numba(
+                    eroded_map, delta_map, float(x), float(y), initial_velocity
+                )
+                deposited[worker] += batch_deposited
+                eroded[worker] += batch_eroded
+        
+        # Merge batch deltas in a fixed order for reproducible sums
+        for row in prange(width):
+            for worker in range(num_workers):
+                for col in range(height):
+                    eroded_map[row, col] += delta_maps[worker, row, col]
+                    delta_maps[worker, row, col] = 0.0
+    
+    return eroded_map, deposited.sum(), eroded.sum()
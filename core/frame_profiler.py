@@ -0,0 +1,105 @@
+import numpy as np
+
+import configuration as config
+import core.state as state
+
+
+class FrameProfiler:
+    """
+    Frame-time statistics over a fixed-size ring buffer.
+
+    Keeps the last FRAME_HISTORY frame times in a preallocated array, so
+    recording a frame is O(1) and allocation free. Reports percentiles
+    rather than only a mean, since a single regeneration stall barely
+    moves the average, and counts frames over FRAME_BUDGET_MS both in the
+    window and since the last reset. The histogram buckets are fractions
+    and multiples of the budget (see bucket_edges).
+
+    Usable without the GUI: record() frame times from any loop and read
+    summary() in automated performance tests.
+    """
+
+    BUDGET_MULTIPLES = (0.5, 1.0, 2.0, 3.0)
+
+    def __init__(self, capacity=None, budget_ms=None):
+        self.capacity = config.FRAME_HISTORY if capacity is None else capacity
+        self.budget_ms = config.FRAME_BUDGET_MS if budget_ms is None else budget_ms
+        self.frame_times = np.zeros(self.capacity, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded frames."""
+        self.count = 0
+        self.next_index = 0
+        self.total_frames = 0
+        self.total_over_budget = 0
+
+    def record(self, frame_ms):
+        """Add one frame time in ms, overwriting the oldest once full."""
+        self.frame_times[self.next_index] = frame_ms
+        self.next_index = (self.next_index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total_frames += 1
+        if frame_ms > self.budget_ms:
+            self.total_over_budget += 1
+
+    @property
+    def window(self):
+        """Recorded frame times in the window, oldest first."""
+        if self.count < self.capacity:
+            return self.frame_times[:self.count]
+        return np.roll(self.frame_times, -self.next_index)
+
+    @property
+    def bucket_edges(self):
+        """Upper edges (ms) of all histogram buckets but the open last one."""
+        return [self.budget_ms * multiple for multiple in self.BUDGET_MULTIPLES]
+
+    def histogram(self):
+        """Frame counts per bucket: below each edge, then at or above the last."""
+        counts = np.bincount(
+            np.searchsorted(self.bucket_edges, self.frame_times[:self.count], side="right"),
+            minlength=len(self.BUDGET_MULTIPLES) + 1
+        )
+        return [int(count) for count in counts]
+
+    def summary(self):
+        """
+        Window statistics as a dict: frames, mean/p50/p95/p99/max frame time
+        (ms), fps from the mean, frames over budget in the window and since
+        the last reset, and the histogram with its bucket edges.
+        """
+        times = self.frame_times[:self.count]
+        if self.count == 0:
+            p50 = p95 = p99 = mean = worst = 0.0
+        else:
+            p50, p95, p99 = np.percentile(times, (50, 95, 99))
+            mean = times.mean()
+            worst = times.max()
+        return {
+            "frames": self.count,
+            "mean_ms": float(mean),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(worst),
+            "fps": float(1000 / mean) if mean > 0 else 0.0,
+            "budget_ms": self.budget_ms,
+            "over_budget": int(np.count_nonzero(times > self.budget_ms)),
+            "total_frames": self.total_frames,
+            "total_over_budget": self.total_over_budget,
+            "bucket_edges": self.bucket_edges,
+            "histogram": self.histogram(),
+        }
+
+    def update_stats(self):
+        """Publish the window statistics to state.STATS."""
+        summary = self.summary()
+        state.STATS.FPS = summary["fps"]
+        state.STATS.FRAME_P50 = summary["p50_ms"]
+        state.STATS.FRAME_P95 = summary["p95_ms"]
+        state.STATS.FRAME_P99 = summary["p99_ms"]
+        state.STATS.FRAME_MAX = summary["max_ms"]
+        state.STATS.FRAMES_OVER_BUDGET = summary["over_budget"]
+        state.STATS.FRAME_HISTOGRAM = summary["histogram"]
+        return summary
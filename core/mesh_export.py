@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import struct
+import time
+import numpy as np
+
+import configuration as config
+from utility import _utility_manager
+
+logger = logging.getLogger("TERRAIN")
+
+# glTF 2.0 constants
+GLB_MAGIC = 0x46546C67       # "glTF"
+GLB_JSON_CHUNK = 0x4E4F534A  # "JSON"
+GLB_BIN_CHUNK = 0x004E4942   # "BIN\0"
+GLTF_FLOAT = 5126
+GLTF_UNSIGNED_INT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+
+class MeshExporter:
+    """
+    Streams a triangle mesh with optional per-vertex normals and colors to
+    binary glTF (.glb), binary PLY or OBJ.
+
+    Arrays are written in blocks of `chunk_size` rows (default
+    EXPORT_CHUNK_SIZE). Blocks that already have the file's dtype and
+    layout go to the file through memoryview without being copied; only
+    interleaved PLY records, dtype conversions and OBJ text are built per
+    block, so memory stays bounded and large exports are I/O bound.
+    """
+
+    FORMATS = (".glb", ".ply", ".obj")
+
+    def __init__(self, chunk_size=None):
+        self.chunk_size = config.EXPORT_CHUNK_SIZE if chunk_size is None else chunk_size
+
+    def export(self, path, vertices, indices, normals=None, colors=None):
+        """
+        Write a mesh to `path` in the format given by its extension.
+
+        `vertices` and `normals` are (N, 3) arrays, `colors` (N, 3) RGB in
+        [0, 1] and `indices` (M, 3) vertex indices. The file is written
+        under a temporary name and moved into place once complete.
+        Returns the number of bytes written.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        writers = {".glb": self.write_glb, ".ply": self.write_ply, ".obj": self.write_obj}
+        if extension not in writers:
+            raise ValueError(f"Unknown mesh format {extension!r}; expected one of {', '.join(self.FORMATS)}")
+        for name, array in (("normals", normals), ("colors", colors)):
+            if array is not None and len(array) != len(vertices):
+                raise ValueError(f"Expected one row of {name} per vertex, got {len(array)} for {len(vertices)}")
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            writers[extension](f, vertices, indices, normals, colors)
+            size = f.tell()
+        os.replace(temp_path, path)
+        return size
+
+    def _blocks(self, array, dtype=None):
+        """Contiguous row blocks of `array`, converted to `dtype`; views
+        when no conversion is needed."""
+        for start in range(0, len(array), self.chunk_size):
+            yield np.ascontiguousarray(array[start:start + self.chunk_size], dtype=dtype)
+
+    def _write_array(self, f, array, dtype):
+        for block in self._blocks(array, dtype):
+            f.write(memoryview(block).cast("B"))
+
+    def write_glb(self, f, vertices, indices, normals=None, colors=None):
+        """Binary glTF 2.0: one buffer with float32 POSITION, NORMAL and
+        COLOR_0 attributes and uint32 triangle indices."""
+        vertex_count = len(vertices)
+        attributes = [("POSITION", vertices), ("NORMAL", normals), ("COLOR_0", colors)]
+        attributes = [(name, array) for name, array in attributes if array is not None]
+
+        buffer_views = []
+        accessors = []
+        offset = 0
+        for name, array in attributes:
+            buffer_views.append({
+                "buffer": 0, "byteOffset": offset, "byteLength": vertex_count * 12,
+                "target": GLTF_ARRAY_BUFFER
+            })
+            accessors.append({
+                "bufferView": len(buffer_views) - 1, "componentType": GLTF_FLOAT,
+                "count": vertex_count, "type": "VEC3"
+            })
+            offset += vertex_count * 12
+        # POSITION requires bounds; reduce per block to avoid a float32 copy
+        if vertex_count:
+            low = np.min([block.min(axis=0) for block in self._blocks(vertices, np.float32)], axis=0)
+            high = np.max([block.max(axis=0) for block in self._blocks(vertices, np.float32)], axis=0)
+            accessors[0]["min"] = [float(value) for value in low]
+            accessors[0]["max"] = [float(value) for value in high]
+
+        index_count = indices.size
+        buffer_views.append({
+            "buffer": 0, "byteOffset": offset, "byteLength": index_count * 4,
+            "target": GLTF_ELEMENT_ARRAY_BUFFER
+        })
+        accessors.append({
+            "bufferView": len(buffer_views) - 1, "componentType": GLTF_UNSIGNED_INT,
+            "count": index_count, "type": "SCALAR"
+        })
+        binary_length = offset + index_count * 4
+
+        gltf = {
+            "asset": {"version": "2.0", "generator": "terrain"},
+            "scene": 0,
+            "scenes": [{"nodes": [0]}],
+            "nodes": [{"mesh": 0, "name": "terrain"}],
+            "meshes": [{"primitives": [{
+                "attributes": {name: index for index, (name, _) in enumerate(attributes)},
+                "indices": len(accessors) - 1,
+            }]}],
+            "buffers": [{"byteLength": binary_length}],
+            "bufferViews": buffer_views,
+            "accessors": accessors,
+        }
+        json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        binary_padding = -binary_length % 4
+
+        total_length = 12 + 8 + len(json_chunk) + 8 + binary_length + binary_padding
+        f.write(struct.pack("<III", GLB_MAGIC, 2, total_length))
+        f.write(struct.pack("<II", len(json_chunk), GLB_JSON_CHUNK))
+        f.write(json_chunk)
+        f.write(struct.pack("<II", binary_length + binary_padding, GLB_BIN_CHUNK))
+        for _, array in attributes:
+            self._write_array(f, array, np.dtype("<f4"))
+        self._write_array(f, indices, np.dtype("<u4"))
+        f.write(b"\0" * binary_padding)
+
+    def write_ply(self, f, vertices, indices, normals=None, colors=None):
+        """Binary little-endian PLY with float positions and normals, uchar
+        RGB colors and uint triangle lists."""
+        fields = [("position", "<f4", (3,))]
+        header = [
+            "ply",
+            "format binary_little_endian 1.0",
+            "comment generated by terrain",
+            f"element vertex {len(vertices)}",
+            "property float x", "property float y", "property float z",
+        ]
+        if normals is not None:
+            fields.append(("normal", "<f4", (3,)))
+            header += ["property float nx", "property float ny", "property float nz"]
+        if colors is not None:
+            fields.append(("color", "u1", (3,)))
+            header += ["property uchar red", "property uchar green", "property uchar blue"]
+        header += [
+            f"element face {len(indices)}",
+            "property list uchar uint vertex_indices",
+            "end_header",
+        ]
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+
+        # Vertex records interleave their properties, so build them per block
+        record = np.dtype(fields)
+        for start in range(0, len(vertices), self.chunk_size):
+            stop = min(start + self.chunk_size, len(vertices))
+            block = np.empty(stop - start, dtype=record)
+            block["position"] = vertices[start:stop]
+            if normals is not None:
+                block["normal"] = normals[start:stop]
+            if colors is not None:
+                block["color"] = _color_bytes(colors[start:stop])
+            f.write(memoryview(block).cast("B"))
+
+        face = np.dtype([("count", "u1"), ("indices", "<u4", (3,))])
+        for start in range(0, len(indices), self.chunk_size):
+            stop = min(start + self.chunk_size, len(indices))
+            block = np.empty(stop - start, dtype=face)
+            block["count"] = 3
+            block["indices"] = indices[start:stop]
+            f.write(memoryview(block).cast("B"))
+
+    def write_obj(self, f, vertices, indices, normals=None, colors=None):
+        """
+        Wavefront OBJ. Colors use the common `v x y z r g b` extension and
+        faces reference normals as `f v//vn`. Each block is formatted with
+        a single %-operation over all of its values rather than per vertex.
+        """
+        f.write(b"# generated by terrain\n")
+        for start in range(0, len(vertices), self.chunk_size):
+            stop = min(start + self.chunk_size, len(vertices))
+            if colors is None:
+                values = np.asarray(vertices[start:stop], dtype=np.float64)
+                line = "v %.6g %.6g %.6g\n"
+            else:
+                values = np.hstack((vertices[start:stop], colors[start:stop]))
+                line = "v %.6g %.6g %.6g %.4g %.4g %.4g\n"
+            f.write(((line * (stop - start)) % tuple(values.ravel().tolist())).encode("ascii"))
+
+        if normals is not None:
+            for block in self._blocks(normals, np.float64):
+                f.write((("vn %.6g %.6g %.6g\n" * len(block)) % tuple(block.ravel().tolist())).encode("ascii"))
+
+        line = "f %d//%d %d//%d %d//%d\n" if normals is not None else "f %d %d %d\n"
+        repeat = 2 if normals is not None else 1
+        for block in self._blocks(indices, np.int64):
+            # OBJ indices are 1-based
+            values = np.repeat(block + 1, repeat, axis=1)
+            f.write(((line * len(block)) % tuple(values.ravel().tolist())).encode("ascii"))
+
+
+def _color_bytes(colors):
+    """[0, 1] float colors as rounded uint8 values."""
+    return np.clip(np.rint(np.asarray(colors) * 255.0), 0, 255).astype(np.uint8)
+
+
+def export_terrain_mesh(path, mesh, normal_map=None, biome_map=None, chunk_size=None):
+    """
+    Export a terrain mesh with its per-vertex normals and, when a
+    `biome_map` is given, the unshaded biome color of every vertex. The format follows
+    the extension of `path`. Usable headless or from the UI. Returns the
+    number of bytes written.
+    """
+    export_start = time.perf_counter()
+    colors = None
+    if biome_map is not None:
+        colors = _utility_manager.get_biome_colors(biome_map, dtype=np.float32)
+    size = MeshExporter(chunk_size).export(path, mesh.vertices, mesh.indices, normal_map, colors)
+    logger.info(
+        f"Exported {mesh.vertex_count:,} vertices / {mesh.triangle_count:,} triangles to {path} "
+        f"({size / 2**20:.1f}MB in {(time.perf_counter() - export_start) * 1000:.1f}ms)"
+    )
+    return size
@@ -0,0 +1,300 @@
+import numpy as np
+from numba import njit, prange
+
+# Ken Perlin's reference permutation, doubled exactly as in the `noise`
+# package (_noise.h) so that pnoise2 results can be reproduced.
+_PERM_BASE = np.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+    36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+    234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+    88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+    134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+    230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+    1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+    116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+    124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+    154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+    108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
+    242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
+    239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+    50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
+    141, 128, 195, 78, 66, 215, 61, 156, 180
+], dtype=np.uint8)
+
+_GRAD3 = np.array([
+    [1, 1, 0], [-1, 1, 0], [1, -1, 0], [-1, -1, 0],
+    [1, 0, 1], [-1, 0, 1], [1, 0, -1], [-1, 0, -1],
+    [0, 1, 1], [0, -1, 1], [0, 1, -1], [0, -1, -1],
+    [1, 0, -1], [-1, 0, -1], [0, -1, 1], [0, 1, 1]
+], dtype=np.float32)
+
+_GRAD4 = np.array([
+    [0, 1, 1, 1], [0, 1, 1, -1], [0, 1, -1, 1], [0, 1, -1, -1],
+    [0, -1, 1, 1], [0, -1, 1, -1], [0, -1, -1, 1], [0, -1, -1, -1],
+    [1, 0, 1, 1], [1, 0, 1, -1], [1, 0, -1, 1], [1, 0, -1, -1],
+    [-1, 0, 1, 1], [-1, 0, 1, -1], [-1, 0, -1, 1], [-1, 0, -1, -1],
+    [1, 1, 0, 1], [1, 1, 0, -1], [1, -1, 0, 1], [1, -1, 0, -1],
+    [-1, 1, 0, 1], [-1, 1, 0, -1], [-1, -1, 0, 1], [-1, -1, 0, -1],
+    [1, 1, 1, 0], [1, 1, -1, 0], [1, -1, 1, 0], [1, -1, -1, 0],
+    [-1, 1, 1, 0], [-1, 1, -1, 0], [-1, -1, 1, 0], [-1, -1, -1, 0]
+], dtype=np.float32)
+
+# The C extension indexes PERM with `hash + base` and so reads past its
+# 512-entry table for any non-zero seed. The compiled module places the
+# GRAD4 and GRAD3 float tables directly after PERM; mirroring their
+# little-endian bytes keeps seeds up to PERM_COMPAT_MAX_BASE bit-compatible.
+PERM = np.concatenate((
+    _PERM_BASE,
+    _PERM_BASE,
+    np.frombuffer(_GRAD4.astype("<f4").tobytes(), dtype=np.uint8),
+    np.frombuffer(_GRAD3.astype("<f4").tobytes(), dtype=np.uint8),
+))
+PERM_COMPAT_MAX_BASE = PERM.shape[0] - 511
+
+# Maximum absolute deviation from noise.pnoise2 for bases within
+# [0, PERM_COMPAT_MAX_BASE]. The kernel repeats the C float32 arithmetic
+# step for step, so in practice results are bit-identical.
+PNOISE2_TOLERANCE = 1e-6
+
+
+@njit(inline="always", cache=True)
+def _perm_lookup(perm, index):
+    """Read the permutation table, wrapping indices beyond the mirrored range."""
+    size = perm.shape[0]
+    if index < 0 or index >= size:
+        index %= size
+    return perm[index]
+
+
+@njit(inline="always", cache=True)
+def _wrap(value, period):
+    """fmodf, skipping the libm call for the common in-range case."""
+    if value >= 0 and value < period:
+        return value
+    return np.float32(np.fmod(value, period))
+
+
+@njit(inline="always", cache=True)
+def _grad2(hash_value, x, y):
+    """Dot product of (x, y) with one of the 16 pseudo-random gradients."""
+    h = hash_value & 15
+    return x * _GRAD3[h, 0] + y * _GRAD3[h, 1]
+
+
+@njit(inline="always", cache=True)
+def _lerp(t, a, b):
+    return a + t * (b - a)
+
+
+@njit(cache=True)
+def perlin_noise2_numba(x, y, repeat_x, repeat_y, base, perm):
+    """
+    Single octave of 2D improved Perlin noise, matching noise._perlin.noise2.
+
+    Args:
+        x (np.float32): Sample x coordinate
+        y (np.float32): Sample y coordinate
+        repeat_x (np.float32): Tiling period along x
+        repeat_y (np.float32): Tiling period along y
+        base (int): Seed offset applied to the permutation lookups
+        perm (numpy.ndarray): Permutation table (see PERM)
+    """
+    one = np.float32(1.0)
+    i = int(np.floor(_wrap(x, repeat_x)))
+    j = int(np.floor(_wrap(y, repeat_y)))
+    ii = int(_wrap(np.float32(i + 1), repeat_x))
+    jj = int(_wrap(np.float32(j + 1), repeat_y))
+    i = (i & 255) + base
+    j = (j & 255) + base
+    ii = (ii & 255) + base
+    jj = (jj & 255) + base
+
+    x = x - np.floor(x)
+    y = y - np.floor(y)
+    fx = x * x * x * (x * (x * np.float32(6.0) - np.float32(15.0)) + np.float32(10.0))
+    fy = y * y * y * (y * (y * np.float32(6.0) - np.float32(15.0)) + np.float32(10.0))
+
+    a = int(_perm_lookup(perm, i))
+    aa = int(_perm_lookup(perm, a + j))
+    ab = int(_perm_lookup(perm, a + jj))
+    b = int(_perm_lookup(perm, ii))
+    ba = int(_perm_lookup(perm, b + j))
+    bb = int(_perm_lookup(perm, b + jj))
+
+    return _lerp(fy,
+                 _lerp(fx, _grad2(int(perm[aa]), x, y),
+                       _grad2(int(perm[ba]), x - one, y)),
+                 _lerp(fx, _grad2(int(perm[ab]), x, y - one),
+                       _grad2(int(perm[bb]), x - one, y - one)))
+
+
+@njit(parallel=True, nogil=True, cache=True)
+def fbm_noise2_numba(xs, ys, octaves, persistence, lacunarity,
+                     repeat_x, repeat_y, base, perm, out):
+    """
+    Evaluate multi-octave (fBm) Perlin noise for flat coordinate arrays.
+
+    Parallelised over samples with Numba; the octave loop accumulates in
+    float32 exactly like noise.pnoise2 so existing seeds reproduce. Every
+    value is a float32, so a float32 `out` stores it without loss.
+
+    Args:
+        xs (numpy.ndarray): Flat float32 array of x coordinates
+        ys (numpy.ndarray): Flat float32 array of y coordinates
+        octaves (int): Number of noise octaves to sum
+        persistence (np.float32): Amplitude multiplier between octaves
+        lacunarity (np.float32): Frequency multiplier between octaves
+        repeat_x (np.float32): Base tiling period along x
+        repeat_y (np.float32): Base tiling period along y
+        base (int): Seed offset for the permutation table
+        perm (numpy.ndarray): Permutation table (see PERM)
+        out (numpy.ndarray): Flat float32 or float64 array receiving the noise
+    """
+    for n in prange(xs.shape[0]):
+        freq = np.float32(1.0)
+        amp = np.float32(1.0)
+        max_amp = np.float32(0.0)
+        total = np.float32(0.0)
+
+        for _ in range(octaves):
+            total += perlin_noise2_numba(
+                xs[n] * freq, ys[n] * freq,
+                repeat_x * freq, repeat_y * freq,
+                base, perm
+            ) * amp
+            max_amp += amp
+            freq *= lacunarity
+            amp *= persistence
+
+        out[n] = total / max_amp
+
+    return out
+
+
+@njit(parallel=True, nogil=True, cache=True)
+def octave_layer_numba(xs, ys, octave, lacunarity, repeat_x, repeat_y, base, perm):
+    """
+    Evaluate a single unweighted fBm octave for flat coordinate arrays.
+
+    The octave frequency is built by repeated float32 multiplication, as in
+    fbm_noise2_numba, so a weighted sum of layers reproduces its output.
+
+    Args:
+        xs (numpy.ndarray): Flat float32 array of x coordinates
+        ys (numpy.ndarray): Flat float32 array of y coordinates
+        octave (int): Zero-based octave index
+        lacunarity (np.float32): Frequency multiplier between octaves
+        repeat_x (np.float32): Base tiling period along x
+        repeat_y (np.float32): Base tiling period along y
+        base (int): Seed offset for the permutation table
+        perm (numpy.ndarray): Permutation table (see PERM)
+    """
+    freq = np.float32(1.0)
+    for _ in range(octave):
+        freq *= lacunarity
+
+    out = np.empty(xs.shape[0], dtype=np.float32)
+    for n in prange(xs.shape[0]):
+        out[n] = perlin_noise2_numba(
+            xs[n] * freq, ys[n] * freq,
+            repeat_x * freq, repeat_y * freq,
+            base, perm
+        )
+    return out
+
+
+def fbm_noise2(xs, ys, octaves=1, persistence=0.5, lacunarity=2.0,
+               repeat_x=1024.0, repeat_y=1024.0, base=0, dtype=np.float64):
+    """
+    Batched drop-in replacement for noise.pnoise2 over coordinate arrays.
+
+    Accepts any broadcastable pair of coordinate arrays and returns a `dtype`
+    (float64 or float32, equal values) array of the broadcast shape. For
+    0 <= base <= PERM_COMPAT_MAX_BASE the output matches pnoise2 to within
+    PNOISE2_TOLERANCE.
+    """
+    if octaves < 1:
+        raise ValueError("Expected octaves value > 0")
+
+    xs, ys = np.broadcast_arrays(np.asarray(xs), np.asarray(ys))
+    shape = xs.shape
+    values = np.empty(xs.size, dtype=dtype)
+    fbm_noise2_numba(
+        np.ascontiguousarray(xs, dtype=np.float32).ravel(),
+        np.ascontiguousarray(ys, dtype=np.float32).ravel(),
+        int(octaves),
+        np.float32(persistence),
+        np.float32(lacunarity),
+        np.float32(repeat_x),
+        np.float32(repeat_y),
+        int(base),
+        PERM,
+        values
+    )
+    return values.reshape(shape)
+
+
+def generate_fbm_heightmap(width, depth, scale, octaves, persistence,
+                           lacunarity, base, dtype=np.float64):
+    """
+    Generate a (width, depth) fBm heightmap in a single batched call.
+
+    Samples the grid at (x / width * scale, z / depth * scale), the same
+    coordinates the original per-cell pnoise2 loop used.
+    """
+    nx, nz = heightmap_coordinates(width, depth, scale)
+    return fbm_noise2(
+        nx, nz,
+        octaves=octaves,
+        persistence=persistence,
+        lacunarity=lacunarity,
+        base=base,
+        dtype=dtype
+    )
+
+
+def heightmap_coordinates(width, depth, scale):
+    """Sample coordinates of a (width, depth) heightmap grid."""
+    nx = np.arange(width, dtype=np.float64) / width * scale
+    nz = np.arange(depth, dtype=np.float64) / depth * scale
+    return nx[:, np.newaxis], nz[np.newaxis, :]
+
+
+def generate_octave_layer(width, depth, scale, octave, lacunarity, base):
+    """
+    Generate one unweighted octave of a (width, depth) fBm heightmap as a
+    float32 layer; see combine_octave_layers.
+    """
+    nx, nz = heightmap_coordinates(width, depth, scale)
+    xs, ys = np.broadcast_arrays(nx, nz)
+    layer = octave_layer_numba(
+        np.ascontiguousarray(xs, dtype=np.float32).ravel(),
+        np.ascontiguousarray(ys, dtype=np.float32).ravel(),
+        int(octave),
+        np.float32(lacunarity),
+        np.float32(1024.0),
+        np.float32(1024.0),
+        int(base),
+        PERM
+    )
+    return layer.reshape(xs.shape)
+
+
+def combine_octave_layers(layers, persistence, dtype=np.float64):
+    """
+    Weighted sum of octave layers normalised by total amplitude.
+
+    Accumulates in float32 in octave order, so the result is identical to
+    generate_fbm_heightmap for the same parameters and dtype.
+    """
+    persistence = np.float32(persistence)
+    amp = np.float32(1.0)
+    max_amp = np.float32(0.0)
+    total = np.zeros(layers[0].shape, dtype=np.float32)
+    for layer in layers:
+        total += layer * amp
+        max_amp += amp
+        amp *= persistence
+    total /= max_amp
+    return total.astype(dtype, copy=False)
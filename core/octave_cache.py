@@ -0,0 +1,75 @@
+import numpy as np
+
+import configuration as config
+import core.state as state
+from core.noise_engine import combine_octave_layers, generate_fbm_heightmap, generate_octave_layer
+
+
+class OctaveLayerCache:
+    """
+    Keeps the unweighted octave layers of the current heightmap.
+
+    Persistence only changes how octaves are weighted, so while seed,
+    scale, resolution and lacunarity stay the same the heightmap is rebuilt
+    as a weighted sum of stored layers instead of re-evaluating noise.
+    Adding octaves only generates the new ones. Layers are kept up to a
+    memory budget; octaves beyond it are regenerated on every build.
+    """
+
+    def __init__(self, budget_mb=None):
+        self.budget_mb = config.HEIGHTMAP_LAYER_CACHE_MB if budget_mb is None else budget_mb
+        self.layer_key = None
+        self.layers = []
+
+    def max_layers(self, width, depth):
+        """Number of (width, depth) float32 layers that fit in the budget."""
+        layer_bytes = width * depth * np.dtype(np.float32).itemsize
+        return int(self.budget_mb * 1024 * 1024 // layer_bytes)
+
+    @property
+    def nbytes(self):
+        return sum(layer.nbytes for layer in self.layers)
+
+    def generate_heightmap(self, width, depth, scale, octaves, persistence,
+                           lacunarity, base, dtype=np.float64):
+        """
+        Build a heightmap identical to generate_fbm_heightmap, reusing stored
+        octave layers for the same seed, scale, resolution and lacunarity.
+        """
+        if octaves < 1:
+            raise ValueError("Expected octaves value > 0")
+
+        layer_key = (width, depth, scale, lacunarity, base)
+        if layer_key != self.layer_key:
+            self.layer_key = layer_key
+            self.layers = []
+
+        keep = self.max_layers(width, depth)
+        del self.layers[keep:]
+        if keep == 0:
+            # Caching disabled or a single layer exceeds the budget
+            state.STATS.LAYERS_REUSED = 0
+            state.STATS.LAYERS_GENERATED = octaves
+            return generate_fbm_heightmap(width, depth, scale, octaves, persistence,
+                                          lacunarity, base, dtype)
+
+        layers = []
+        reused = 0
+        for octave in range(octaves):
+            if octave < len(self.layers):
+                layers.append(self.layers[octave])
+                reused += 1
+                continue
+            layer = generate_octave_layer(width, depth, scale, octave, lacunarity, base)
+            if octave < keep:
+                self.layers.append(layer)
+            layers.append(layer)
+
+        state.STATS.LAYERS_REUSED = reused
+        state.STATS.LAYERS_GENERATED = octaves - reused
+        return combine_octave_layers(layers, persistence, dtype)
+
+    def clear(self):
+        """Drop all stored layers."""
+        self.layer_key = None
+        self.layers = []
@@ -0,0 +1,44 @@
+import numpy as np
+
+import configuration as config
+
+PRECISIONS = ("float64", "float32")
+
+
+def float_dtype():
+    """Float dtype of terrain layers, erosion and shading under PRECISION."""
+    if config.PRECISION not in PRECISIONS:
+        raise ValueError(
+            f"Unknown PRECISION {config.PRECISION!r}; expected one of {', '.join(PRECISIONS)}"
+        )
+    return np.dtype(config.PRECISION)
+
+
+def _nbytes(value, seen):
+    """Bytes held by the arrays in `value` (an array, a tuple/list of them,
+    or an object with vertices/indices), counting each array once."""
+    if value is None or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item, seen) for item in value)
+    return sum(_nbytes(getattr(value, name, None), seen) for name in ("vertices", "indices"))
+
+
+def memory_report(layers):
+    """
+    Bytes per named layer, in the order given. Arrays shared between
+    layers are only counted for the first one; dropped (None) layers
+    report 0.
+    """
+    seen = set()
+    return {name: _nbytes(value, seen) for name, value in layers.items()}
+
+
+def format_memory_report(report):
+    """Format a memory_report as one line per layer plus the total, in MB."""
+    lines = [f"  {name}: {nbytes / 2**20:.2f}MB" for name, nbytes in report.items()]
+    lines.append(f"  total: {sum(report.values()) / 2**20:.2f}MB")
+    return "\n".join(lines)
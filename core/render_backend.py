@@ -0,0 +1,187 @@
+import logging
+import numpy as np
+from OpenGL.GL import *
+
+from core.terrain_lod import frustum_planes
+
+logger = logging.getLogger("TERRAIN")
+
+
+class ImmediateModeBackend:
+    """
+    Legacy rendering path that re-submits every triangle each frame.
+
+    Issues one glColor3f/glVertex3f pair per triangle corner between
+    glBegin/glEnd. Kept as a fallback for drivers without buffer object
+    support and for debugging.
+    """
+
+    name = "IMMEDIATE"
+
+    def __init__(self):
+        self.vertices = None
+        self.indices = None
+        self.colors = None
+
+    def upload_mesh(self, vertices, indices):
+        """Keep references to the mesh arrays for per-frame submission."""
+        self.vertices = vertices
+        self.indices = indices
+
+    def upload_indices(self, indices):
+        """Replace the triangle list drawn each frame."""
+        self.indices = indices
+
+    def upload_colors(self, colors):
+        """Keep a reference to the per-vertex color array."""
+        self.colors = colors
+
+    def draw(self):
+        """Submit the full mesh with immediate-mode calls."""
+        if self.vertices is None or self.colors is None:
+            return
+
+        glBegin(GL_TRIANGLES)
+        for triangle in self.indices:
+            for vertex_index in triangle:
+                glColor3f(*self.colors[vertex_index])
+                glVertex3f(*self.vertices[vertex_index])
+        glEnd()
+
+    def release(self):
+        """Drop references to mesh data."""
+        self.vertices = None
+        self.indices = None
+        self.colors = None
+
+
+class BufferObjectBackend:
+    """
+    Retained-mode rendering path using vertex and index buffer objects.
+
+    Positions and triangle indices are uploaded once per regeneration into
+    static buffers; per-vertex colors live in their own buffer so they can
+    be refreshed independently. Each frame is a single glDrawElements call.
+    """
+
+    name = "VBO"
+
+    def __init__(self):
+        self.position_buffer = None
+        self.color_buffer = None
+        self.index_buffer = None
+        self.index_count = 0
+        self.vertex_count = 0
+
+    def upload_mesh(self, vertices, indices):
+        """Upload vertex positions and triangle indices to the GPU."""
+        self.release()
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        indices = np.ascontiguousarray(indices, dtype=np.uint32)
+
+        self.position_buffer, self.color_buffer, self.index_buffer = glGenBuffers(3)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.position_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+
+        # Reserve color storage; contents arrive through upload_colors
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        self.vertex_count = vertices.shape[0]
+        self.index_count = indices.size
+
+    def upload_indices(self, indices):
+        """Replace the triangle index buffer, e.g. after an LOD change."""
+        if self.index_buffer is None:
+            return
+        indices = np.ascontiguousarray(indices, dtype=np.uint32)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.index_count = indices.size
+
+    def upload_colors(self, colors):
+        """Overwrite the per-vertex color buffer in place."""
+        if self.color_buffer is None:
+            return
+        colors = np.ascontiguousarray(colors, dtype=np.float32)
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, colors.nbytes, colors)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        """Draw the uploaded mesh with a single indexed draw call."""
+        if self.index_buffer is None:
+            return
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.position_buffer)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glColorPointer(3, GL_FLOAT, 0, None)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, None)
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def release(self):
+        """Delete any GPU buffers owned by this backend."""
+        if self.index_buffer is not None:
+            glDeleteBuffers(3, [self.position_buffer, self.color_buffer, self.index_buffer])
+        self.position_buffer = None
+        self.color_buffer = None
+        self.index_buffer = None
+        self.index_count = 0
+        self.vertex_count = 0
+
+
+RENDER_BACKENDS = {
+    ImmediateModeBackend.name: ImmediateModeBackend,
+    BufferObjectBackend.name: BufferObjectBackend,
+}
+_unknown_backends = set()
+
+
+def resolve_render_backend(name):
+    """Registered name of the backend create_render_backend(name) builds;
+    unknown names resolve to the IMMEDIATE fallback."""
+    name = name.upper()
+    return name if name in RENDER_BACKENDS else ImmediateModeBackend.name
+
+
+def create_render_backend(name):
+    """Instantiate the rendering backend registered under `name`. Unknown
+    names fall back to IMMEDIATE, with one warning per name."""
+    resolved = resolve_render_backend(name)
+    if resolved != name.upper() and name not in _unknown_backends:
+        _unknown_backends.add(name)
+        logger.warning(f"Unknown render backend '{name}', falling back to {resolved}")
+    return RENDER_BACKENDS[resolved]()
+
+
+def read_frustum_planes():
+    """Clip planes of the current OpenGL projection and model-view
+    matrices, in model space (see core.terrain_lod.frustum_planes)."""
+    return frustum_planes(
+        glGetDoublev(GL_PROJECTION_MATRIX),
+        glGetDoublev(GL_MODELVIEW_MATRIX)
+    )
+
+
+def load_camera_view(eye_position):
+    """Reset the model-view matrix to look from `eye_position`."""
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+    glTranslatef(-eye_position[0], -eye_position[1], -eye_position[2])
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+import numpy as np
+from numba import get_num_threads
+
+import configuration as config
+
+logger = logging.getLogger("TERRAIN")
+
+
+def _compile(kernel, *args):
+    """Compile (or load from cache) `kernel` for the types of `args` without
+    running it."""
+    from numba import typeof
+    kernel.compile(tuple(typeof(arg) for arg in args))
+
+
+def warm_up_kernels():
+    """
+    Compile (or load from Numba's on-disk cache) every JIT kernel for the
+    argument types the application passes, so the first terrain, erosion
+    run and frame do not stall on compilation. Float arrays use the
+    PRECISION dtype. Parallel kernels are only compiled, not run. Returns
+    the elapsed time in ms.
+    """
+    from core.erosion import (
+        simulate_hydraulic_erosion_numba, simulate_hydraulic_erosion_parallel_numba
+    )
+    from core.noise_engine import PERM, fbm_noise2_numba, octave_layer_numba
+    from core.precision import float_dtype
+    from core.terrain_generation import compute_blinn_phong_intensities_numba
+
+    warmup_start = time.perf_counter()
+    dtype = float_dtype()
+    coords = np.zeros(4, dtype=np.float32)
+    # Argument types as passed by fbm_noise2 and generate_octave_layer
+    _compile(fbm_noise2_numba, coords, coords, 1, np.float32(0.5), np.float32(2.0),
+             np.float32(1024.0), np.float32(1024.0), 0, PERM, np.zeros(4, dtype=dtype))
+    _compile(octave_layer_numba, coords, coords, 0, np.float32(2.0),
+             np.float32(1024.0), np.float32(1024.0), 0, PERM)
+
+    heightmap = np.zeros((4, 4), dtype=dtype)
+    _compile(simulate_hydraulic_erosion_parallel_numba, heightmap, 1, 0.0, 0, 1, 1)
+    simulate_hydraulic_erosion_numba(heightmap, iterations=1, initial_velocity=0.0, seed=0)
+
+    normals = np.zeros((4, 3), dtype=dtype)
+    normals[:, 1] = 1.0
+    light_dir = np.asarray(config.LIGHTING_L_DIR, dtype=dtype)
+    view_dir = np.asarray(config.LIGHTING_V_DIR, dtype=dtype)
+    compute_blinn_phong_intensities_numba(
+        normals,
+        light_dir / np.linalg.norm(light_dir),
+        view_dir / np.linalg.norm(view_dir),
+        config.LIGHTING_K_AMB,
+        config.LIGHTING_K_DIFF,
+        config.LIGHTING_K_SPEC,
+        config.LIGHTING_SHIN
+    )
+    return (time.perf_counter() - warmup_start) * 1000
+
+
+class KernelWarmup:
+    """
+    Runs warm_up_kernels on a background thread.
+
+    Started before the window and GUI are created, so kernel compilation
+    overlaps with context setup. wait() before the first terrain makes its
+    remaining compile time show up separately from generation time.
+    """
+
+    def __init__(self):
+        self.thread = None
+        self.elapsed_ms = None
+        self.error = None
+
+    def start(self):
+        """Begin compiling kernels in the background."""
+        # Loading parallel kernels starts Numba's thread pool; start it here
+        # on the calling thread, as TBB hangs on exit if a worker thread did
+        get_num_threads()
+        self.thread = threading.Thread(target=self._run, name="jit-warmup", daemon=True)
+        self.thread.start()
+
+    def wait(self):
+        """Block until warm-up has finished. Returns the elapsed time in ms."""
+        if self.thread is not None:
+            self.thread.join()
+        return self.elapsed_ms
+
+    def _run(self):
+        try:
+            self.elapsed_ms = warm_up_kernels()
+            logger.info(f"JIT kernels ready in {self.elapsed_ms:.1f}ms")
+        except Exception as e:
+            self.error = e
+            logger.error(f"JIT warm-up failed: {e}")
+
+
+class StartupTimer:
+    """
+    Records named startup phases between consecutive mark() calls.
+
+    `start_time` is a time.perf_counter() value taken before the
+    application's imports, so the first phase covers module import time.
+    """
+
+    def __init__(self, start_time):
+        self.start_time = start_time
+        self.last_time = start_time
+        self.phases = []
+
+    def mark(self, name):
+        """Close the current phase under `name`. Returns its length in ms."""
+        now = time.perf_counter()
+        elapsed = (now - self.last_time) * 1000
+        self.phases.append((name, elapsed))
+        self.last_time = now
+        return elapsed
+
+    @property
+    def total_ms(self):
+        return (self.last_time - self.start_time) * 1000
+
+    def report(self):
+        """Log every phase and the total time to the last mark."""
+        logger.info("Startup timing:")
+        for name, elapsed in self.phases:
+            logger.info(f"  {name:<12} {elapsed:8.1f}ms")
+        logger.info(f"  {'total':<12} {self.total_ms:8.1f}ms")
@@ -1,4 +1,5 @@
 TERRAIN_NEEDS_UPDATE = False
 TERRAIN_REGEN_REQ = False
+MESH_EXPORT_REQ = None
 
 MESH = None
\ No newline at end of file
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+import numpy as np
+from numba import get_num_threads
+
+import configuration as config
+import core.state as state
+
+logger = logging.getLogger("TERRAIN")
+
+# Bump whenever the generation pipeline changes its output so stale
+# on-disk entries are never reused.
+CACHE_FORMAT_VERSION = 1
+
+
+class TerrainCacheEntry:
+    """
+    Generated terrain layers needed to rebuild the mesh and shading.
+
+    Stores the (possibly eroded) heightmap used for the mesh, the normal
+    map, the biome map and the erosion totals reported for it.
+    """
+
+    def __init__(self, heightmap, normal_map, biome_map,
+                 total_deposited=0.0, total_eroded=0.0):
+        self.heightmap = heightmap
+        self.normal_map = normal_map
+        self.biome_map = biome_map
+        self.total_deposited = total_deposited
+        self.total_eroded = total_eroded
+
+    @property
+    def nbytes(self):
+        return self.heightmap.nbytes + self.normal_map.nbytes + self.biome_map.nbytes
+
+
+class TerrainCache:
+    """
+    Content-addressed cache of generated terrains.
+
+    Entries are keyed by a hash of every parameter that affects generated
+    output and kept in a bounded in-memory LRU. When a cache directory is
+    configured, entries are also written to and read back from uncompressed
+    `.npz` files so they survive restarts.
+    """
+
+    def __init__(self, max_entries=None, cache_dir=None):
+        self.max_entries = config.TERRAIN_CACHE_SIZE if max_entries is None else max_entries
+        self.cache_dir = config.TERRAIN_CACHE_DIR if cache_dir is None else cache_dir
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def generation_parameters():
+        """Collect every configuration value that changes generated terrain."""
+        params = {
+            "version": CACHE_FORMAT_VERSION,
+            "seed": config.HEIGHTMAP_BASE_SEED,
+            "width": config.HEIGHTMAP_WIDTH,
+            "depth": config.HEIGHTMAP_DEPTH,
+            "scale": config.HEIGHTMAP_SCALE,
+            "octaves": config.HEIGHTMAP_OCTAVES,
+            "persistence": config.HEIGHTMAP_PERSISTENCE,
+            "lacunarity": config.HEIGHTMAP_LACUNARITY,
+            "temperature": config.BIOME_TEMPERATURE,
+            "moisture": config.BIOME_MOISTURE,
+            "climate_resolution": config.CLIMATE_RESOLUTION,
+            "precision": config.PRECISION,
+            "erosion": config.SIMULATE_EROSION,
+        }
+        # Erosion settings only matter while erosion is enabled
+        if config.SIMULATE_EROSION:
+            params.update({
+                "iterations": config.EROSION_ITERATIONS,
+                "init_velocity": config.EROSION_INIT_VELOCITY,
+                "parallel": config.EROSION_PARALLEL,
+                "workers": config.EROSION_WORKERS or get_num_threads(),
+                "sync_rounds": config.EROSION_SYNC_ROUNDS,
+            })
+        return params
+
+    @staticmethod
+    def make_key(params=None):
+        """Hash generation parameters into a stable hexadecimal cache key."""
+        if params is None:
+            params = TerrainCache.generation_parameters()
+        encoded = json.dumps(params, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key):
+        """Look up an entry in memory, then on disk. Records hit/miss stats."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        else:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self._store_in_memory(key, entry)
+
+        if entry is None:
+            state.STATS.CACHE_MISSES += 1
+        else:
+            state.STATS.CACHE_HITS += 1
+        return entry
+
+    def put(self, key, entry):
+        """Insert an entry, evicting the least recently used beyond capacity."""
+        self._store_in_memory(key, entry)
+        self._save_to_disk(key, entry)
+
+    def clear(self):
+        """Drop all in-memory entries (on-disk files are kept)."""
+        self.entries.clear()
+
+    def _store_in_memory(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _save_to_disk(self, key, entry):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez(
+                self._entry_path(key),
+                heightmap=entry.heightmap,
+                normal_map=entry.normal_map,
+                biome_map=entry.biome_map,
+                erosion_totals=np.array([entry.total_deposited, entry.total_eroded])
+            )
+        except OSError as e:
+            logger.warning(f"Could not write terrain cache entry {key[:12]}: {e}")
+
+    def _load_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                total_deposited, total_eroded = data["erosion_totals"]
+                return TerrainCacheEntry(
+                    data["heightmap"],
+                    data["normal_map"],
+                    data["biome_map"],
+                    float(total_deposited),
+                    float(total_eroded)
+                )
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable terrain cache entry {key[:12]}: {e}")
+            return None
@@ -1,16 +1,89 @@
+import logging
 import time
 import numpy as np
-from noise import pnoise2
 from numba import njit
-from pygame.locals import *
-from OpenGL.GL import * 
-from OpenGL.GLU import *
 
 import configuration as config
+from core.erosion import erode_heightmap
+from core.octave_cache import OctaveLayerCache
+from core.precision import float_dtype, memory_report
+from core.terrain_cache import TerrainCache, TerrainCacheEntry
+from core.terrain_lod import TerrainLOD
+from core.terrain_pipeline import PipelineStage, TerrainPipeline, record_stage_time
+from core.tracing import _span_tracer
+import models.mesh
 import models.terrain
 import core.state as state
 import utility
 
+logger = logging.getLogger("TERRAIN")
+
+class VertexColorCache:
+    """
+    Holds the final shaded per-vertex colors between frames.
+    
+    Colors depend only on the terrain, the lighting coefficients and the
+    biome toggle, so they are recomputed only when one of those changes.
+    Terrain changes are signalled explicitly through invalidate(); lighting
+    and biome settings are compared against the values used for the
+    cached colors on every lookup.
+    """
+    
+    def __init__(self):
+        self.colors = None
+        self.key = None
+        self.normal_map = None
+        self.biome_map = None
+    
+    @staticmethod
+    def current_key():
+        """Snapshot of every configuration value that affects vertex colors."""
+        return (
+            config.SIMULATE_BIOME,
+            config.LIGHTING_K_AMB,
+            config.LIGHTING_K_DIFF,
+            config.LIGHTING_K_SPEC,
+            config.LIGHTING_SHIN,
+            tuple(np.asarray(config.LIGHTING_L_DIR).tolist()),
+            tuple(np.asarray(config.LIGHTING_V_DIR).tolist())
+        )
+    
+    def is_valid(self):
+        """Check whether the cached colors match the current settings."""
+        return self.colors is not None and self.key == self.current_key()
+    
+    def store(self, colors, normal_map=None, biome_map=None):
+        """Cache colors computed with the current settings and inputs."""
+        self.colors = colors
+        self.key = self.current_key()
+        self.normal_map = normal_map
+        self.biome_map = biome_map
+    
+    def invalidate(self):
+        """Drop cached colors, e.g. after the terrain was regenerated."""
+        self.colors = None
+        self.key = None
+        self.normal_map = None
+        self.biome_map = None
+
+
+class TerrainBundle:
+    """
+    A fully generated terrain ready to be swapped in for rendering.
+    
+    Produced off the render thread by TerrainRenderer.build_terrain_bundle;
+    only the GPU upload remains to be done when it is applied.
+    """
+    
+    def __init__(self, mesh, normal_map, biome_map, gen_time, lod=None):
+        self.mesh = mesh
+        self.normal_map = normal_map
+        self.biome_map = biome_map
+        self.gen_time = gen_time          # build time (ms)
+        self.lod = lod                    # TerrainLOD patches, None when LOD and culling are off
+        self.width, self.depth = biome_map.shape
+
+
 class TerrainRenderer:
     """
     Handles terrain generation, mesh creation, and OpenGL rendering.
@@ -22,6 +95,104 @@ class TerrainRenderer:
     def __init__(self):
         """Initialize the terrain renderer."""
         self.utility_manager = utility.UtilityManager()
+        self.render_backend = None   # created on first apply, see _create_render_backend
+        self.color_cache = VertexColorCache()
+        self.terrain_cache = TerrainCache()
+        self.octave_cache = OctaveLayerCache()
+        self.terrain_lod = None
+        self.drawn_indices = None
+        self.eye_position = None
+        self.pipeline = self._create_pipeline()
+    
+    def _create_pipeline(self):
+        """
+        Declare the terrain generation stages and their dependencies.
+        
+        heightmap -> erosion -> normals / mesh, heightmap -> climate -> biomes.
+        Shaded colors form the final stage and are memoized separately by
+        VertexColorCache on the render thread. Float outputs follow the
+        heightmap's PRECISION dtype.
+        """
+        return TerrainPipeline([
+            PipelineStage(
+                "heightmap",
+                lambda: self.octave_cache.generate_heightmap(
+                    config.HEIGHTMAP_WIDTH,
+                    config.HEIGHTMAP_DEPTH,
+                    config.HEIGHTMAP_SCALE,
+                    config.HEIGHTMAP_OCTAVES,
+                    config.HEIGHTMAP_PERSISTENCE,
+                    config.HEIGHTMAP_LACUNARITY,
+                    config.HEIGHTMAP_BASE_SEED,
+                    float_dtype()
+                ),
+                params=("HEIGHTMAP_BASE_SEED", "HEIGHTMAP_WIDTH", "HEIGHTMAP_DEPTH",
+                        "HEIGHTMAP_SCALE", "HEIGHTMAP_OCTAVES",
+                        "HEIGHTMAP_PERSISTENCE", "HEIGHTMAP_LACUNARITY", "PRECISION")
+            ),
+            PipelineStage(
+                "erosion",
+                lambda heightmap: (
+                    self.erode_heightmap(heightmap),
+                    state.STATS.TOTAL_D,
+                    state.STATS.TOTAL_E
+                ),
+                params=("EROSION_ITERATIONS", "EROSION_INIT_VELOCITY",
+                        "EROSION_PARALLEL", "EROSION_WORKERS",
+                        "EROSION_SYNC_ROUNDS", "HEIGHTMAP_BASE_SEED"),
+                inputs=("heightmap",),
+                enabled_by="SIMULATE_EROSION"
+            ),
+            PipelineStage(
+                "normals",
+                lambda erosion: models.terrain.compute_normal_map(erosion[0], dtype=erosion[0].dtype),
+                inputs=("erosion",)
+            ),
+            PipelineStage(
+                "climate",
+                models.terrain.generate_climate_maps,
+                params=("HEIGHTMAP_BASE_SEED", "BIOME_TEMPERATURE", "BIOME_MOISTURE", "CLIMATE_RESOLUTION"),
+                inputs=("heightmap",)
+            ),
+            PipelineStage(
+                "biomes",
+                lambda climate: self.utility_manager.get_biome_ids(*climate),
+                inputs=("climate",)
+            ),
+            PipelineStage(
+                "mesh",
+                self._build_mesh,
+                params=("HEIGHTMAP_SCALE",),
+                inputs=("erosion",)
+            ),
+            PipelineStage(
+                "patches",
+                self._build_patches,
+                params=("LOD_ENABLED", "FRUSTUM_CULLING", "LOD_PATCH_SIZE", "LOD_LEVELS",
+                        "LOD_PIXEL_ERROR", "ELEVATION_VIEW"),
+                inputs=("erosion", "mesh")
+            ),
+        ])
+    
+    @staticmethod
+    def _build_mesh(erosion):
+        """Triangulate the (eroded) heightmap into a new Mesh."""
+        mesh = models.mesh.Mesh()
+        mesh.build_grid(erosion[0], config.HEIGHTMAP_SCALE)
+        return mesh
+    
+    def _build_patches(self, erosion, mesh):
+        """Split a mesh into patches with bounding boxes and LOD errors, and
+        select levels for the default camera so the first frame is ready.
+        Returns None when neither LOD nor frustum culling is enabled."""
+        if not (config.LOD_ENABLED or config.FRUSTUM_CULLING):
+            return None
+        width, depth = erosion[0].shape
+        lod = TerrainLOD(mesh.vertices, width, depth)
+        lod.build_indices(
+            self.utility_manager.get_camera_eye_pos(width, depth, config.ELEVATION_VIEW)
+        )
+        return lod
         
     def generate_mesh(self, heightmap):
         """
@@ -30,143 +201,274 @@ class TerrainRenderer:
         Creates a triangulated mesh suitable for OpenGL rendering, with optional
         hydraulic erosion simulation applied to the heightmap.
         """
-        # Clear previous mesh data
-        state.MESH.vertices = []
-        state.MESH.indices = []
+        heightmap = self.erode_heightmap(heightmap)
         
-        width, depth = heightmap.shape
+        # Build vertex and triangle index arrays from the heightmap
+        state.MESH.build_grid(heightmap, config.HEIGHTMAP_SCALE)
+    
+    def erode_heightmap(self, heightmap):
+        """Apply hydraulic erosion to the heightmap if enabled and record
+        erosion statistics. Returns the heightmap to build the mesh from."""
         erosion_start_time = time.perf_counter()
         self.utility_manager.reset_erosion_statistics()
         
         # Apply hydraulic erosion if enabled
         if config.SIMULATE_EROSION:
-            heightmap, state.STATS.TOTAL_D, state.STATS.TOTAL_E = (
-                simulate_hydraulic_erosion_numba(
-                    heightmap, 
-                    iterations=config.EROSION_ITERATIONS,
-                    initial_velocity=config.EROSION_INIT_VELOCITY
-                )
-            )
+            heightmap, state.STATS.TOTAL_D, state.STATS.TOTAL_E = erode_heightmap(heightmap)
             state.STATS.ERO_TIME = (time.perf_counter() - erosion_start_time) * 1000
             self.utility_manager.output_erosion_statistics()
-            
-        # Generate vertex list from heightmap
-        for x in range(width):
-            for z in range(depth):
-                y = heightmap[x][z] * config.HEIGHTMAP_SCALE
-                state.MESH.vertices.append((x, y, z))
-                
-        # Generate triangle indices for mesh connectivity
-        for x in range(width - 1):
-            for z in range(depth - 1):
-                # Calculate vertex indices for current quad
-                top_left = x * depth + z
-                top_right = (x + 1) * depth + z
-                bottom_left = x * depth + (z + 1)
-                bottom_right = (x + 1) * depth + (z + 1)
-                
-                # Create two triangles per quad
-                state.MESH.indices.append((top_left, bottom_left, top_right))
-                state.MESH.indices.append((top_right, bottom_left, bottom_right))
+        
+        return heightmap
     
-    def regenerate_terrain(self):
+    def build_terrain_bundle(self):
         """
-        Generate a new terrain with current configuration parameters.
+        Generate terrain data and mesh arrays for the current parameters.
         
-        Creates a new Terrain object, generates the mesh, updates statistics,
-        and configures the OpenGL camera view.
+        Reuses a cached terrain when one was generated with identical
+        parameters; otherwise runs the stage pipeline, which recomputes only
+        the stages whose parameters or inputs changed since the last run.
+        Touches no OpenGL state and does not replace state.MESH, so it is
+        safe to run on a worker thread.
         """
-        generation_start = time.perf_counter()
+        with _span_tracer.span("regenerate"):
+            generation_start = time.perf_counter()
+            self.pipeline.begin_run()
+        
+            # Look up or create terrain with current parameters
+            with _span_tracer.span("cache lookup"):
+                cache_key = self.terrain_cache.make_key()
+                terrain = self.terrain_cache.get(cache_key)
+            if terrain is None:
+                heightmap, total_deposited, total_eroded = self.pipeline.get("erosion")
+                terrain = TerrainCacheEntry(
+                    heightmap,
+                    self.pipeline.get("normals"),
+                    self.pipeline.get("biomes"),
+                    total_deposited,
+                    total_eroded
+                )
+                if config.DROP_CLIMATE_MAPS:
+                    self.pipeline.discard("climate")
+                # Parameters edited mid-generation would make the key lie
+                if self.terrain_cache.make_key() == cache_key:
+                    self.terrain_cache.put(cache_key, terrain)
+            else:
+                self.utility_manager.reset_erosion_statistics()
+                self.pipeline.provide(
+                    "erosion", 
+                    (terrain.heightmap, terrain.total_deposited, terrain.total_eroded)
+                )
+                self.pipeline.provide("normals", terrain.normal_map)
+                self.pipeline.provide("biomes", terrain.biome_map)
         
-        # Create new terrain with current parameters
-        terrain = models.terrain.Terrain()
-        self.generate_mesh(terrain.heightmap)
+            state.STATS.TOTAL_D = terrain.total_deposited
+            state.STATS.TOTAL_E = terrain.total_eroded
+            mesh = self.pipeline.get("mesh")
+            lod = self.pipeline.get("patches")
+            self.pipeline.end_run()
+            logger.info(f"Pipeline stages: {self.pipeline.report()}")
+            state.STATS.LAYER_MEMORY = self.memory_report()
+        
+        return TerrainBundle(
+            mesh,
+            terrain.normal_map,
+            terrain.biome_map,
+            (time.perf_counter() - generation_start) * 1000,
+            lod
+        )
+    
+    def apply_terrain_bundle(self, bundle):
+        """
+        Make a finished terrain bundle the active terrain.
+        
+        Swaps in the new mesh, uploads it to the rendering backend, updates
+        statistics and configures the OpenGL camera view. Must run on the
+        render thread; the GPU upload is the only expensive step.
+        """
+        from core.render_backend import load_camera_view
+        apply_start = time.perf_counter()
+        if self.render_backend is None:
+            self.render_backend = self._create_render_backend()
+        
+        # Unchanged stages hand back the very same arrays; skip their upload
+        if bundle.mesh is not state.MESH:
+            state.MESH = bundle.mesh
+            with _span_tracer.span("upload mesh"):
+                self.render_backend.upload_mesh(state.MESH.vertices, state.MESH.indices)
+            self.drawn_indices = state.MESH.indices
+            self.color_cache.invalidate()
+        self.terrain_lod = bundle.lod
+        if (bundle.normal_map is not self.color_cache.normal_map
+                or bundle.biome_map is not self.color_cache.biome_map):
+            self.color_cache.invalidate()
+        if self.color_cache.is_valid():
+            record_stage_time("colors", None)
         
         # Configure camera position based on terrain size
         eye_position = self.utility_manager.get_camera_eye_pos(
-            config.HEIGHTMAP_WIDTH, 
-            config.HEIGHTMAP_DEPTH, 
+            bundle.width, 
+            bundle.depth, 
             config.ELEVATION_VIEW
         )
+        self.eye_position = eye_position
+        
+        # Reset OpenGL model-view matrix and position camera; LOD selection
+        # and culling below read the view from it
+        load_camera_view(eye_position)
         
         # Update mesh statistics
-        state.STATS.VERTEX_COUNT = len(state.MESH.vertices)
-        state.STATS.TRIANGLE_COUNT = len(state.MESH.indices)
-        state.STATS.GEN_TIME = (time.perf_counter() - generation_start) * 1000
+        state.STATS.VERTEX_COUNT = state.MESH.vertex_count
+        self._update_lod_indices()
+        state.STATS.GEN_TIME = bundle.gen_time + (time.perf_counter() - apply_start) * 1000
         
-        # Reset OpenGL model-view matrix and position camera
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
-        glTranslatef(-eye_position[0], -eye_position[1], -eye_position[2])
+        return bundle.normal_map, bundle.biome_map
+    
+    def regenerate_terrain(self):
+        """
+        Generate a new terrain with current configuration parameters.
         
-        return terrain.normal_map, terrain.biome_map
+        Synchronous path: builds the terrain bundle and applies it
+        immediately. Returns the normal map and biome map for rendering.
+        """
+        return self.apply_terrain_bundle(self.build_terrain_bundle())
     
-    def render_terrain(self, normals, biome_map):
+    def compute_vertex_colors(self, normals, biome_map, vertices=None):
         """
-        Render the terrain mesh with Blinn-Phong lighting and biome coloring.
+        Compute the shaded RGB color of every mesh vertex.
         
-        Applies lighting calculations to each vertex and renders triangles
-        with appropriate colors based on biome information or height-based
-        coloring.
+        Combines Blinn-Phong intensities with a base color taken from the
+        biome map or, when biomes are disabled, from the vertex height.
+        Shading runs in the dtype of `normals`. Returns a float32 (N, 3)
+        array aligned with `vertices` (default state.MESH.vertices).
         """
-        vertices = state.MESH.vertices
-        indices = state.MESH.indices
+        if vertices is None:
+            vertices = state.MESH.vertices
+        dtype = normals.dtype
         
         # Calculate lighting intensities for all vertices
         intensities = compute_blinn_phong_intensities_numba(
-            np.array(normals),
-            config.LIGHTING_L_DIR,
-            config.LIGHTING_V_DIR,
+            np.ascontiguousarray(normals),
+            np.asarray(config.LIGHTING_L_DIR, dtype=dtype),
+            np.asarray(config.LIGHTING_V_DIR, dtype=dtype),
             config.LIGHTING_K_AMB,
             config.LIGHTING_K_DIFF,
             config.LIGHTING_K_SPEC,
             config.LIGHTING_SHIN
         )
         
-        # Render triangulated mesh
-        glBegin(GL_TRIANGLES)
-        for triangle in indices:
-            for vertex_index in triangle:
-                vertex = vertices[vertex_index]
-                intensity = intensities[vertex_index]
-                
-                # Determine base color from biome or height
-                if config.SIMULATE_BIOME:
-                    base_color = self.utility_manager.get_biome_color_from_vertex(
-                        vertex, biome_map
-                    )
-                else:
-                    # Height-based coloring for non-biome mode
-                    height_factor = vertex[1]
-                    base_color = np.array([
-                        0.3 + height_factor * 0.02,
-                        0.3 + height_factor * 0.10,
-                        0.3
-                    ])
-                
-                # Apply lighting to base color
-                shaded_color = np.clip(np.array(base_color) * intensity, 0.0, 1.0)
-                
-                glColor3f(*shaded_color)
-                glVertex3f(*vertex)
-        glEnd()
+        # Determine base color from biome or height
+        if config.SIMULATE_BIOME:
+            base_colors = self.utility_manager.get_biome_colors(biome_map, dtype=dtype)
+        else:
+            # Height-based coloring for non-biome mode
+            height_factor = vertices[:, 1]
+            base_colors = np.column_stack((
+                0.3 + height_factor * 0.02,
+                0.3 + height_factor * 0.10,
+                np.full_like(height_factor, 0.3)
+            ))
+        
+        # Apply lighting to base color
+        shaded_colors = np.clip(base_colors * intensities[:, np.newaxis], 0.0, 1.0)
+        return shaded_colors.astype(np.float32, copy=False)
+    
+    def memory_report(self):
+        """
+        Bytes held by each memoized pipeline output, the shaded colors and
+        both caches; arrays shared between them are counted once. See
+        core.precision.format_memory_report.
+        """
+        layers = self.pipeline.outputs()
+        layers["colors"] = self.color_cache.colors
+        layers["octave layers"] = self.octave_cache.layers
+        layers["terrain cache"] = [
+            (entry.heightmap, entry.normal_map, entry.biome_map)
+            for entry in self.terrain_cache.entries.values()
+        ]
+        return memory_report(layers)
+    
+    @staticmethod
+    def _create_render_backend():
+        """Create the configured rendering backend. OpenGL is only imported
+        here, so building terrain bundles (e.g. headless) never loads it."""
+        from core.render_backend import create_render_backend
+        return create_render_backend(config.RENDER_BACKEND)
+    
+    def _sync_render_backend(self):
+        """Switch rendering backend if the configured one has changed."""
+        from core.render_backend import resolve_render_backend
+        if self.render_backend.name == resolve_render_backend(config.RENDER_BACKEND):
+            return
+        self.render_backend.release()
+        self.render_backend = self._create_render_backend()
+        self.render_backend.upload_mesh(state.MESH.vertices, state.MESH.indices)
+        self.drawn_indices = state.MESH.indices
+        self.color_cache.invalidate()
+    
+    def _update_lod_indices(self):
+        """Re-select LOD levels and visible patches for the camera and
+        upload the index list when it changed; falls back to the full mesh
+        when neither LOD nor frustum culling is enabled."""
+        if self.terrain_lod is not None and (config.LOD_ENABLED or config.FRUSTUM_CULLING):
+            from core.render_backend import read_frustum_planes
+            planes = read_frustum_planes() if config.FRUSTUM_CULLING else None
+            indices, _ = self.terrain_lod.build_indices(self.eye_position, planes)
+            state.STATS.PATCHES_DRAWN = self.terrain_lod.drawn_patch_count
+            state.STATS.PATCHES_CULLED = self.terrain_lod.culled_patch_count
+        else:
+            indices = state.MESH.indices
+            state.STATS.PATCHES_DRAWN = 0
+            state.STATS.PATCHES_CULLED = 0
+        
+        if indices is not self.drawn_indices:
+            self.render_backend.upload_indices(indices)
+            self.drawn_indices = indices
+        state.STATS.TRIANGLE_COUNT = self.drawn_indices.shape[0]
+    
+    def render_terrain(self, normals, biome_map):
+        """
+        Render the terrain mesh with Blinn-Phong lighting and biome coloring.
+        
+        Per-vertex colors are recomputed and handed to the active rendering
+        backend (buffer objects or immediate mode, see config.RENDER_BACKEND)
+        only when the color cache is stale; steady-state frames just draw.
+        """
+        self._sync_render_backend()
+        with _span_tracer.span("lod"):
+            self._update_lod_indices()
+        
+        if not self.color_cache.is_valid():
+            colors_start = time.perf_counter()
+            with _span_tracer.span("colors"):
+                colors = self.compute_vertex_colors(normals, biome_map)
+                self.color_cache.store(colors, normals, biome_map)
+                self.render_backend.upload_colors(colors)
+            record_stage_time("colors", (time.perf_counter() - colors_start) * 1000)
+            state.STATS.LAYER_MEMORY = dict(state.STATS.LAYER_MEMORY, colors=colors.nbytes)
+        with _span_tracer.span("draw"):
+            self.render_backend.draw()
+    
+    def release(self):
+        """Release GPU resources held by the rendering backend."""
+        if self.render_backend is not None:
+            self.render_backend.release()
 
 
-@njit
+@njit(cache=True)
 def compute_blinn_phong_intensities_numba(normals, light_dir, view_dir, 
                                         k_ambient, k_diffuse, k_specular, shininess):
     """
     Compute Blinn-Phong lighting intensities for terrain vertices  
     Args:
         normals (numpy.ndarray): Surface normal vectors for each vertex
-        light_dir (numpy.ndarray): Normalized light direction vector
-        view_dir (numpy.ndarray): Normalized view direction vector
+        light_dir (numpy.ndarray): Normalized light direction vector (dtype of normals)
+        view_dir (numpy.ndarray): Normalized view direction vector (dtype of normals)
         k_ambient (float): Ambient reflection coefficient
         k_diffuse (float): Diffuse reflection coefficient
         k_specular (float): Specular reflection coefficient
         shininess (float): Specular shininess exponent
     """
-    intensities = np.zeros(normals.shape[0])
+    intensities = np.zeros(normals.shape[0], dtype=normals.dtype)
     
     # Calculate half-vector for Blinn-Phong model
     half_vec = (light_dir + view_dir)
@@ -189,90 +491,3 @@ def compute_blinn_phong_intensities_numba(normals, light_dir, view_dir,
         intensities[i] = np.minimum(1.0, np.maximum(0.0, total_intensity))
         
     return intensities
-
-
-@njit
-def simulate_hydraulic_erosion_numba(heightmap, iterations=1000000, 
-                                   initial_velocity=0.0, erosion_radius=3):
-    """
-    Simulate hydraulic erosion using water droplet physics.
-    
-    Optimized using Numba JIT compilation for performance. Simulates
-    water droplets flowing across the terrain, carrying and depositing
-    sediment based on velocity and slope.
-    
-    Args:
-        heightmap (numpy.ndarray): Input terrain heightmap to erode
-        iterations (int): Number of water droplets to simulate
-        initial_velocity (float): Starting velocity for droplets
-        erosion_radius (int): Influence radius for erosion effects
-    """
-    eroded_map = heightmap.copy()
-    width, height = eroded_map.shape
-    total_deposited = 0.0
-    total_eroded = 0.0
-    
-    for _ in range(iterations):
-        x, y = np.random.randint(0, width), np.random.randint(0, height)
-        droplet_velocity = initial_velocity
-        droplet_sediment = 0.0
-        droplet_water = 1.0
-        
-        # Simulate droplet lifetime for random droplet
-        for _ in range(30):  # Maximum droplet lifetime steps
-            x_int, y_int = int(x), int(y)
-            
-            # Calculate terrain gradient using bilinear interpolation
-            if x_int < 0 or x_int >= width - 1 or y_int < 0 or y_int >= height - 1:
-                gradient_x = 0.0
-                gradient_y = 0.0
-            else:
-                # Bilinear interpolation for smooth gradients
-                x_frac, y_frac = x - x_int, y - y_int
-                h00 = eroded_map[x_int, y_int]
-                h10 = eroded_map[x_int + 1, y_int]
-                h01 = eroded_map[x_int, y_int + 1]
-                h11 = eroded_map[x_int + 1, y_int + 1]
-                
-                gradient_x = (h10 - h00) * (1 - y_frac) + (h11 - h01) * y_frac
-                gradient_y = (h01 - h00) * (1 - x_frac) + (h11 - h10) * x_frac
-
-                gradient_x = max(-10.0, min(10.0, gradient_x))
-                gradient_y = max(-10.0, min(10.0, gradient_y))
-
-            gradient_magnitude = max(1e-6, np.sqrt(gradient_x**2 + gradient_y**2))
-            
-            # Stop if no gradient (flat area)
-            if gradient_x == 0.0 and gradient_y == 0.0:
-                break
-                
-            # Move droplet down gradient
-            x -= gradient_x / gradient_magnitude
-            y -= gradient_y / gradient_magnitude
-
-            if x < 0 or x >= width or y < 0 or y >= height:
-                break
-                
-            x_int, y_int = int(x), int(y)
-            slope = np.sqrt(gradient_x**2 + gradient_y**2)
-            
-            # Calculate sediment carrying capacity
-            carrying_capacity = droplet_velocity * droplet_water * slope * 0.1
-            
-            # Deposit or erode based on capacity
-            if droplet_sediment > carrying_capacity or eroded_map[x_int, y_int] < 0.0:
-                deposit_amount = max(0.0, (droplet_sediment - carrying_capacity) * 0.3)
-                eroded_map[x_int, y_int] += deposit_amount
-                droplet_sediment -= deposit_amount
-                total_deposited += deposit_amount
-            else:
-                max_erosion = eroded_map[x_int, y_int] * 0.99
-                erode_amount = min((carrying_capacity - droplet_sediment) * 0.3, max_erosion)
-                eroded_map[x_int, y_int] -= erode_amount
-                droplet_sediment += erode_amount
-                total_eroded += erode_amount
-
-            droplet_velocity = max(0.0, droplet_velocity + slope - 0.1)
-            droplet_water *= 0.99  # Evaporation
-    
-    return eroded_map, total_deposited, total_eroded
\ No newline at end of file
@@ -0,0 +1,262 @@
+import math
+import numpy as np
+
+import configuration as config
+
+
+def _level_positions(start, end, stride):
+    """Sample positions in [start, end] at `stride`, always keeping `end`."""
+    positions = np.arange(start, end, stride)
+    return np.append(positions, end)
+
+
+def _snap(values, targets):
+    """Move each value to the nearest target position (ties go down)."""
+    upper = np.clip(np.searchsorted(targets, values), 1, len(targets) - 1)
+    lower = upper - 1
+    use_upper = (targets[upper] - values) < (values - targets[lower])
+    return np.where(use_upper, targets[upper], targets[lower])
+
+
+def _interpolate_axis(values, positions, size, axis):
+    """Piecewise-linearly resample `values`, sampled at `positions` along
+    `axis`, back to all `size` grid positions."""
+    grid = np.arange(size)
+    segment = np.clip(np.searchsorted(positions, grid, side="right") - 1, 0, len(positions) - 2)
+    t = (grid - positions[segment]) / (positions[segment + 1] - positions[segment])
+    lower = np.take(values, segment, axis=axis)
+    upper = np.take(values, segment + 1, axis=axis)
+    shape = [1, 1]
+    shape[axis] = size
+    t = t.reshape(shape)
+    return lower * (1.0 - t) + upper * t
+
+
+def frustum_planes(projection, modelview):
+    """
+    Extract the six clip planes (left, right, bottom, top, near, far) from
+    OpenGL projection and model-view matrices as read by glGetDoublev
+    (column-major). Returns a (6, 4) array of (a, b, c, d) with points
+    inside satisfying a*x + b*y + c*z + d >= 0 in model space.
+    """
+    clip = (np.asarray(modelview, dtype=np.float64) @ np.asarray(projection, dtype=np.float64)).T
+    planes = np.array([
+        clip[3] + clip[0], clip[3] - clip[0],
+        clip[3] + clip[1], clip[3] - clip[1],
+        clip[3] + clip[2], clip[3] - clip[2],
+    ])
+    return planes / np.linalg.norm(planes[:, :3], axis=1)[:, np.newaxis]
+
+def boxes_in_frustum(planes, low, high):
+    """
+    Test axis-aligned boxes against frustum planes.
+
+    `low` and `high` are (..., 3) box corners; returns a boolean array of
+    the leading shape that is False only for boxes entirely outside one
+    plane (conservative: boxes near frustum corners may be kept).
+    """
+    normals = planes[:, :3]
+    # Box corner furthest along each plane normal
+    corner = np.where(normals >= 0, high[..., np.newaxis, :], low[..., np.newaxis, :])
+    distance = np.einsum("...pk,pk->...p", corner, normals) + planes[:, 3]
+    return np.all(distance >= 0, axis=-1)
+
+
+class TerrainLOD:
+    """
+    Geomipmapped level of detail for a grid terrain mesh.
+
+    The terrain is split into square patches of LOD_PATCH_SIZE cells. Level
+    L of the mip pyramid samples the heightmap every 2**L vertices, and
+    each patch stores the largest height error of every level against the
+    full-resolution surface. Each frame a patch uses the coarsest level
+    whose error, projected to the screen at the patch's distance from the
+    camera, stays within LOD_PIXEL_ERROR pixels. Edges facing a coarser
+    neighbour snap their vertices onto that neighbour's edge samples, so
+    patches meet without cracks. Vertices stay in the full-resolution
+    vertex buffer; only the index list changes between levels.
+
+    The patch bounding boxes also drive view-frustum culling: patches
+    outside the frustum contribute no triangles to the index list.
+    """
+
+    def __init__(self, vertices, width, depth, patch_size=None, levels=None):
+        self.width = width
+        self.depth = depth
+        self.patch_size = config.LOD_PATCH_SIZE if patch_size is None else patch_size
+        levels = config.LOD_LEVELS if levels is None else levels
+        # A stride never exceeds the patch size, so patch edges stay samples
+        self.strides = [
+            2 ** level for level in range(max(levels, 1))
+            if 2 ** level <= self.patch_size
+        ]
+
+        heights = vertices[:, 1].reshape(width, depth).astype(np.float64)
+        self.x_starts = np.arange(0, max(width - 1, 1), self.patch_size)
+        self.z_starts = np.arange(0, max(depth - 1, 1), self.patch_size)
+        self.x_ends = np.minimum(self.x_starts + self.patch_size, width - 1)
+        self.z_ends = np.minimum(self.z_starts + self.patch_size, depth - 1)
+        self.patch_shape = (len(self.x_starts), len(self.z_starts))
+
+        self.pyramid = []
+        self.level_errors = self._compute_level_errors(heights)
+        self.bounds = self._compute_bounds(heights)
+
+        self.patch_indices = {}
+        self.selected_levels = None
+        self.visible_patches = None
+        self.indices = None
+
+    def _compute_level_errors(self, heights):
+        """Build the mip pyramid and the max height error of every patch at
+        every level, shaped (patches_x, patches_z, levels)."""
+        errors = np.empty(self.patch_shape + (len(self.strides),))
+        for level, stride in enumerate(self.strides):
+            xs = _level_positions(0, self.width - 1, stride)
+            zs = _level_positions(0, self.depth - 1, stride)
+            decimated = heights[np.ix_(xs, zs)]
+            self.pyramid.append(decimated)
+
+            approximation = _interpolate_axis(decimated, zs, self.depth, axis=1)
+            approximation = _interpolate_axis(approximation, xs, self.width, axis=0)
+            error = np.abs(heights - approximation)
+            error = np.maximum.reduceat(error, self.x_starts, axis=0)
+            errors[:, :, level] = np.maximum.reduceat(error, self.z_starts, axis=1)
+        return errors
+
+    def _compute_bounds(self, heights):
+        """Axis-aligned bounding box of every patch as (min, max) corners,
+        each shaped (patches_x, patches_z, 3)."""
+        low = np.empty(self.patch_shape)
+        high = np.empty(self.patch_shape)
+        for i, (x0, x1) in enumerate(zip(self.x_starts, self.x_ends)):
+            for j, (z0, z1) in enumerate(zip(self.z_starts, self.z_ends)):
+                block = heights[x0:x1 + 1, z0:z1 + 1]
+                low[i, j] = block.min()
+                high[i, j] = block.max()
+
+        grid_x0, grid_z0 = np.meshgrid(self.x_starts, self.z_starts, indexing="ij")
+        grid_x1, grid_z1 = np.meshgrid(self.x_ends, self.z_ends, indexing="ij")
+        return (
+            np.stack((grid_x0, low, grid_z0), axis=-1).astype(np.float64),
+            np.stack((grid_x1, high, grid_z1), axis=-1).astype(np.float64)
+        )
+
+    def select_levels(self, eye_position):
+        """Pick the coarsest level per patch that keeps the projected height
+        error within LOD_PIXEL_ERROR pixels from `eye_position`. With
+        LOD_ENABLED off every patch stays at full resolution."""
+        if not config.LOD_ENABLED:
+            return np.zeros(self.patch_shape, dtype=np.intp)
+
+        low, high = self.bounds
+        eye = np.asarray(eye_position, dtype=np.float64)
+        offset = np.maximum(np.maximum(low - eye, eye - high), 0.0)
+        distance = np.maximum(np.sqrt(np.einsum("ijk,ijk->ij", offset, offset)), 1e-6)
+
+        # Pixels per world unit of error at distance 1
+        pixels_per_unit = config.WINDOW_HEIGHT / (2.0 * math.tan(math.radians(config.WINDOW_FOV) / 2.0))
+        projected = self.level_errors * pixels_per_unit / distance[:, :, np.newaxis]
+        acceptable = projected <= config.LOD_PIXEL_ERROR
+
+        # Coarsest acceptable level; level 0 has no error and is always kept
+        level_ids = np.arange(len(self.strides))
+        return np.max(np.where(acceptable, level_ids, 0), axis=2)
+
+    def build_indices(self, eye_position, planes=None):
+        """
+        Return the uint32 (M, 3) triangle indices for the current view, and
+        whether they changed since the previous call.
+
+        Patches whose bounding box lies outside the frustum `planes` (see
+        frustum_planes) are left out; None draws every patch.
+        """
+        levels = self.select_levels(eye_position)
+        if planes is None:
+            visible = np.ones(self.patch_shape, dtype=bool)
+        else:
+            visible = boxes_in_frustum(planes, *self.bounds)
+        if (self.selected_levels is not None
+                and np.array_equal(levels, self.selected_levels)
+                and np.array_equal(visible, self.visible_patches)):
+            return self.indices, False
+
+        patches = []
+        patch_count_x, patch_count_z = self.patch_shape
+        for i, j in zip(*np.nonzero(visible)):
+            level = levels[i, j]
+            # Each edge uses the coarser stride of this patch and its neighbour
+            edges = (
+                levels[i - 1, j] if i > 0 else level,
+                levels[i + 1, j] if i < patch_count_x - 1 else level,
+                levels[i, j - 1] if j > 0 else level,
+                levels[i, j + 1] if j < patch_count_z - 1 else level,
+            )
+            edges = tuple(max(level, edge) for edge in edges)
+            patches.append(self._patch_indices(i, j, level, edges))
+
+        self.selected_levels = levels
+        self.visible_patches = visible
+        self.indices = np.concatenate(patches) if patches else np.empty((0, 3), dtype=np.uint32)
+        return self.indices, True
+
+    @property
+    def drawn_patch_count(self):
+        return 0 if self.visible_patches is None else int(np.count_nonzero(self.visible_patches))
+
+    @property
+    def culled_patch_count(self):
+        return 0 if self.visible_patches is None else int(self.visible_patches.size - self.drawn_patch_count)
+
+    def _patch_indices(self, i, j, level, edges):
+        """Triangle indices of one patch at a level, with its (x-, x+, z-, z+)
+        edges snapped to the given coarser levels. Cached per combination."""
+        key = (int(i), int(j), int(level), tuple(int(edge) for edge in edges))
+        indices = self.patch_indices.get(key)
+        if indices is not None:
+            return indices
+
+        x0, x1 = self.x_starts[i], self.x_ends[i]
+        z0, z1 = self.z_starts[j], self.z_ends[j]
+        stride = self.strides[level]
+        xs = _level_positions(x0, x1, stride)
+        zs = _level_positions(z0, z1, stride)
+        grid_x, grid_z = np.meshgrid(xs, zs, indexing="ij")
+
+        west, east, north, south = (self.strides[edge] for edge in edges)
+        if west > stride:
+            grid_z[0, :] = _snap(grid_z[0, :], _level_positions(z0, z1, west))
+        if east > stride:
+            grid_z[-1, :] = _snap(grid_z[-1, :], _level_positions(z0, z1, east))
+        if north > stride:
+            grid_x[:, 0] = _snap(grid_x[:, 0], _level_positions(x0, x1, north))
+        if south > stride:
+            grid_x[:, -1] = _snap(grid_x[:, -1], _level_positions(x0, x1, south))
+
+        # Same corner order and winding as Mesh.build_grid
+        vertex_ids = (grid_x * self.depth + grid_z).astype(np.uint32)
+        top_left = vertex_ids[:-1, :-1].ravel()
+        top_right = vertex_ids[1:, :-1].ravel()
+        bottom_left = vertex_ids[:-1, 1:].ravel()
+        bottom_right = vertex_ids[1:, 1:].ravel()
+
+        indices = np.empty((top_left.shape[0] * 2, 3), dtype=np.uint32)
+        indices[0::2] = np.column_stack((top_left, bottom_left, top_right))
+        indices[1::2] = np.column_stack((top_right, bottom_left, bottom_right))
+
+        # Snapping collapses some edge triangles; drop the degenerate ones
+        degenerate = (
+            (indices[:, 0] == indices[:, 1]) |
+            (indices[:, 1] == indices[:, 2]) |
+            (indices[:, 0] == indices[:, 2])
+        )
+        indices = indices[~degenerate]
+        self.patch_indices[key] = indices
+        return indices
+
+    def report(self):
+        """Patch count per selected level, e.g. {0: 12, 1: 4}."""
+        if self.selected_levels is None:
+            return {}
+        levels, counts = np.unique(self.selected_levels, return_counts=True)
+        return {int(level): int(count) for level, count in zip(levels, counts)}
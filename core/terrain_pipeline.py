@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+
+import configuration as config
+import core.state as state
+from core.tracing import _span_tracer
+
+logger = logging.getLogger("TERRAIN")
+
+# Guards the STAGE_TIMES/RUNS/SKIPS dicts of state.STATS: the worker
+# publishes pipeline runs while the render thread records colors and chunks
+# and the UI reads them
+_stage_stats_lock = threading.Lock()
+
+
+class PipelineStage:
+    """
+    One step of the terrain pipeline with its declared dependencies.
+
+    `params` names the configuration values the stage reads and `inputs`
+    the upstream stages whose outputs it consumes. When `enabled_by` names
+    a boolean configuration flag that is off, the remaining params are
+    ignored for invalidation since the stage then passes its input through.
+    """
+
+    def __init__(self, name, compute, params=(), inputs=(), enabled_by=None):
+        self.name = name
+        self.compute = compute
+        self.params = tuple(params)
+        self.inputs = tuple(inputs)
+        self.enabled_by = enabled_by
+
+    def parameter_values(self):
+        """Current values of the configuration parameters this stage reads."""
+        if self.enabled_by is not None and not getattr(config, self.enabled_by):
+            return (self.enabled_by, False)
+        return tuple(getattr(config, name) for name in self.params)
+
+
+class TerrainPipeline:
+    """
+    Memoized dependency graph of terrain generation stages.
+
+    Every stage keeps its last output together with a signature made of
+    its own parameter values and the signatures of its inputs. Requesting a
+    stage recomputes it only when that signature changed, so a parameter
+    change invalidates exactly the stages downstream of where it is read.
+    Per-stage timings of a run are collected privately and published to
+    state.STATS by end_run; run/skip counts are updated as stages finish.
+    """
+
+    def __init__(self, stages):
+        self.stages = {stage.name: stage for stage in stages}
+        self.memo = {}
+        self.run_times = {}
+
+    def signature(self, name):
+        """Parameter-derived signature of a stage's output."""
+        stage = self.stages[name]
+        return (
+            name,
+            stage.parameter_values(),
+            tuple(self.signature(upstream) for upstream in stage.inputs)
+        )
+
+    def get(self, name):
+        """Return a stage's output, recomputing it and its stale inputs only."""
+        stage = self.stages[name]
+        signature = self.signature(name)
+
+        # A current output is returned without touching its inputs, which
+        # may have been discarded since
+        cached = self.memo.get(name)
+        if cached is not None and cached[0] == signature:
+            self._skip(name)
+            return cached[1]
+
+        inputs = [self.get(upstream) for upstream in stage.inputs]
+        stage_start = time.perf_counter()
+        with _span_tracer.span(name):
+            output = stage.compute(*inputs)
+        self._record(name, (time.perf_counter() - stage_start) * 1000)
+        self.memo[name] = (signature, output)
+        return output
+
+    def _skip(self, name):
+        """Record a current stage and everything upstream of it as skipped."""
+        if name in self.run_times:
+            return
+        self._record(name, None)
+        for upstream in self.stages[name].inputs:
+            self._skip(upstream)
+
+    def discard(self, name):
+        """Forget a stage's output to free its memory. Downstream outputs
+        stay valid; the stage is recomputed only if one of them is."""
+        self.memo.pop(name, None)
+
+    def outputs(self):
+        """Current output of every memoized stage, in declaration order."""
+        return {name: self.memo[name][1] for name in self.stages if name in self.memo}
+
+    def provide(self, name, output):
+        """Seed a stage with an output produced elsewhere (e.g. a cache hit)
+        for the current parameters, so downstream stages can reuse it."""
+        self.memo[name] = (self.signature(name), output)
+        self._record(name, None)
+
+    def begin_run(self):
+        """Reset per-run stage timings before requesting outputs."""
+        self.run_times = {}
+
+    def end_run(self):
+        """Publish this run's stage timings in declaration order. Timings
+        recorded outside the pipeline (e.g. colors) are kept after them."""
+        ordered = {name: self.run_times[name] for name in self.stages if name in self.run_times}
+        with _stage_stats_lock:
+            ordered.update(
+                (name, elapsed) for name, elapsed in state.STATS.STAGE_TIMES.items()
+                if name not in self.stages
+            )
+            state.STATS.STAGE_TIMES = ordered
+
+    def report(self):
+        """One-line summary of the last run: time per stage or 'skip'."""
+        return " ".join(
+            f"{name}={'skip' if elapsed is None else f'{elapsed:.1f}ms'}"
+            for name, elapsed in self.run_times.items()
+        )
+
+    def _record(self, name, elapsed):
+        self.run_times[name] = elapsed
+        _count_stage(name, elapsed)
+
+
+def _count_stage(name, elapsed):
+    """Count a run (elapsed in ms) or a skip (None) of a stage."""
+    counts = state.STATS.STAGE_SKIPS if elapsed is None else state.STATS.STAGE_RUNS
+    with _stage_stats_lock:
+        counts[name] = counts.get(name, 0) + 1
+
+
+def record_stage_time(name, elapsed):
+    """Publish the run time in ms, or None when skipped, of a stage that
+    runs outside the pipeline (e.g. on the render thread)."""
+    with _stage_stats_lock:
+        state.STATS.STAGE_TIMES[name] = elapsed
+    _count_stage(name, elapsed)
+
+
+def stage_statistics():
+    """Consistent copies of the published stage times, run counts and
+    skip counts, safe to iterate while other threads record stages."""
+    with _stage_stats_lock:
+        return (
+            dict(state.STATS.STAGE_TIMES),
+            dict(state.STATS.STAGE_RUNS),
+            dict(state.STATS.STAGE_SKIPS)
+        )
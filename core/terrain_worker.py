@@ -0,0 +1,82 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import core.state as state
+
+logger = logging.getLogger("TERRAIN")
+
+
+class TerrainRegenerationWorker:
+    """
+    Runs terrain regeneration off the render loop.
+
+    Regeneration requests are built into TerrainBundles on a single
+    background thread while the main loop keeps drawing the current
+    terrain. At most one request runs and one waits; further requests made
+    while one is waiting are merged into it, since only the latest
+    parameters matter. Finished bundles are collected with poll() on the
+    render thread, which then swaps them in.
+    """
+
+    def __init__(self, terrain_renderer):
+        self.terrain_renderer = terrain_renderer
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="terrain-regen")
+        self.active_job = None
+        self.active_submit_time = 0.0
+        self.queued_submit_time = None
+
+    @property
+    def busy(self):
+        return self.active_job is not None or self.queued_submit_time is not None
+
+    def submit(self):
+        """Request a regeneration with the current configuration."""
+        if self.active_job is None:
+            self._start(time.perf_counter())
+        elif self.queued_submit_time is None:
+            self.queued_submit_time = time.perf_counter()
+        self._update_stats()
+
+    def poll(self):
+        """
+        Return the newest finished bundle, or None if nothing is ready.
+
+        Starts the waiting request once the active one completes. Failed
+        jobs are logged and skipped.
+        """
+        if self.active_job is None or not self.active_job.done():
+            return None
+
+        job, submit_time = self.active_job, self.active_submit_time
+        self.active_job = None
+        if self.queued_submit_time is not None:
+            self._start(self.queued_submit_time)
+            self.queued_submit_time = None
+
+        bundle = None
+        try:
+            bundle = job.result()
+            state.STATS.REGEN_LATENCY = (time.perf_counter() - submit_time) * 1000
+        except Exception as e:
+            logger.error(f"Terrain regeneration failed: {e}")
+
+        self._update_stats()
+        return bundle
+
+    def shutdown(self):
+        """Stop accepting work and wait for the running job to finish."""
+        self.queued_submit_time = None
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.active_job = None
+        self._update_stats()
+
+    def _start(self, submit_time):
+        self.active_submit_time = submit_time
+        self.active_job = self.executor.submit(self.terrain_renderer.build_terrain_bundle)
+
+    def _update_stats(self):
+        state.STATS.REGEN_QUEUE = (
+            (1 if self.active_job is not None else 0) +
+            (1 if self.queued_submit_time is not None else 0)
+        )
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import configuration as config
+
+logger = logging.getLogger("TERRAIN")
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    One timed region. Times are time.perf_counter_ns() values; children are
+    the spans opened on the same thread while this one was open.
+    """
+
+    __slots__ = ("tracer", "name", "args", "thread_id", "depth", "start", "end", "children")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.thread_id = None
+        self.depth = 0
+        self.start = 0
+        self.end = 0
+        self.children = []
+
+    @property
+    def duration_ms(self):
+        return (self.end - self.start) / 1e6
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.depth = len(stack)
+        self.thread_id = threading.get_ident()
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.perf_counter_ns()
+        stack = self.tracer._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children.append(self)
+        else:
+            self.tracer.last_roots[self.name] = self
+        self.tracer.spans.append(self)
+        return False
+
+
+class SpanTracer:
+    """
+    Nested timing spans kept in a bounded ring buffer.
+
+    Wrap a region in `with _span_tracer.span("name"):` to time it; spans
+    opened inside it on the same thread become its children. The newest
+    TRACE_BUFFER_SIZE spans are kept for Chrome trace export, and the last
+    finished top-level span of every name is kept as a tree for the stats
+    panel breakdown. While TRACE_SPANS is off, span() returns a shared
+    no-op context manager, so instrumented code costs one flag check.
+    """
+
+    def __init__(self, capacity=None):
+        capacity = config.TRACE_BUFFER_SIZE if capacity is None else capacity
+        self.spans = deque(maxlen=capacity)
+        self.last_roots = {}
+        self.thread_names = {}
+        self.local = threading.local()
+
+    def span(self, name, **args):
+        """Context manager timing the enclosed block as span `name`.
+        Keyword arguments are stored with the span and exported."""
+        if not config.TRACE_SPANS:
+            return _NULL_SPAN
+        return Span(self, name, args)
+
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+            self.thread_names[threading.get_ident()] = threading.current_thread().name
+        return stack
+
+    def clear(self):
+        """Drop all recorded spans."""
+        self.spans.clear()
+        self.last_roots = {}
+
+    def format_breakdown(self, name, max_depth=2):
+        """
+        Indented per-child timings of the last finished top-level span
+        `name`, down to `max_depth` levels below it, or None if there is
+        none yet.
+        """
+        root = self.last_roots.get(name)
+        if root is None:
+            return None
+        lines = [f"{name}: {root.duration_ms:.1f}ms"]
+
+        def add_children(span, level):
+            if level > max_depth:
+                return
+            for child in span.children:
+                lines.append(f"{'  ' * level}{child.name}: {child.duration_ms:.1f}ms")
+                add_children(child, level + 1)
+
+        add_children(root, 1)
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Recorded spans as a Chrome trace-event dict (chrome://tracing,
+        Perfetto), using complete ("X") events in microseconds."""
+        pid = os.getpid()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+             "args": {"name": thread_name}}
+            for thread_id, thread_name in list(self.thread_names.items())
+        ]
+        for span in sorted(list(self.spans), key=lambda span: span.start):
+            events.append({
+                "name": span.name,
+                "cat": "terrain",
+                "ph": "X",
+                "ts": span.start / 1000,
+                "dur": (span.end - span.start) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {key: str(value) for key, value in span.args.items()},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """Write the recorded spans to `path` as Chrome trace-event JSON.
+        Returns the number of spans written."""
+        trace = self.chrome_trace()
+        with open(path, "w") as f:
+            json.dump(trace, f)
+        span_count = sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+        logger.info(f"Wrote {span_count} spans to {path}")
+        return span_count
+
+
+# Global span tracer instance
+_span_tracer = SpanTracer()
@@ -1,7 +1,11 @@
 import logging
+import os
+import time
 import dearpygui.dearpygui as dpg
 import configuration as config
 import core.state as state
+from core.frame_profiler import FrameProfiler
+from core.tracing import _span_tracer
 
 logger = logging.getLogger("TERRAIN")
 
@@ -186,6 +190,19 @@ class TerrainControlPanel:
                 label="REGENERATE", 
                 callback=self._request_terrain_regeneration
             )
+            
+            # Mesh export
+            dpg.add_combo(
+                label="Export Format",
+                items=["glb", "ply", "obj"],
+                default_value=config.EXPORT_FORMAT,
+                tag="export_format",
+                callback=self._set_export_format
+            )
+            dpg.add_button(
+                label="Export Mesh",
+                callback=self._request_mesh_export
+            )
     
     def _update_terrain_parameters(self, sender, app_data):
         """Handle parameter updates from UI controls."""
@@ -209,8 +226,15 @@ class TerrainControlPanel:
             "shininess": "LIGHTING_SHIN"
         }
         
-        # Special handling for iteration count (snap to increments)
-        if sender == "iterations":
+        # Parameters that only affect vertex colors (lighting, biome coloring)
+        shading_params = {"biome", "ambient", "diffuse", "specular", "shininess"}
+        
+        if sender in shading_params:
+            # The vertex color cache re-shades the current normals on the
+            # next frame, so no terrain regeneration is needed
+            setattr(config, param_map[sender], app_data)
+        elif sender == "iterations":
+            # Special handling for iteration count (snap to increments)
             step_size = 10000
             snapped_value = round(app_data / step_size) * step_size
             dpg.set_value("iterations", snapped_value)
@@ -229,6 +253,17 @@ class TerrainControlPanel:
         """Handle regeneration button click."""
         if state.TERRAIN_NEEDS_UPDATE:
             state.TERRAIN_REGEN_REQ = True
+    
+    def _set_export_format(self, sender, app_data):
+        """Select the file format of the next mesh export."""
+        config.EXPORT_FORMAT = app_data
+    
+    def _request_mesh_export(self):
+        """Handle export button click; the main loop writes the file."""
+        state.MESH_EXPORT_REQ = os.path.join(
+            config.EXPORT_DIR,
+            time.strftime(f"terrain_mesh_%Y%m%d_%H%M%S.{config.EXPORT_FORMAT}")
+        )
 
 
 class StatisticsPanel:
@@ -242,7 +277,7 @@ class StatisticsPanel:
     
     def __init__(self):
         self.window_width = 400
-        self.window_height = 280
+        self.window_height = 520
         self.window_pos = (0, 360)
     
     def create_panel(self):
@@ -265,6 +300,10 @@ class StatisticsPanel:
                 f"Vertices: {state.STATS.VERTEX_COUNT}", 
                 tag="vert_count"
             )
+            dpg.add_text(
+                f"Patches Drawn/Culled: {state.STATS.PATCHES_DRAWN}/{state.STATS.PATCHES_CULLED}", 
+                tag="patch_stats"
+            )
             
             # Performance timing
             dpg.add_text(
@@ -275,6 +314,34 @@ class StatisticsPanel:
                 f"Rendering Time: {state.STATS.RENDER_TIME}", 
                 tag="render_time"
             )
+            dpg.add_text(
+                f"Regen Queue: {state.STATS.REGEN_QUEUE} | Latency: {state.STATS.REGEN_LATENCY}", 
+                tag="regen_stats"
+            )
+            dpg.add_text(
+                f"Cache Hits/Misses: {state.STATS.CACHE_HITS}/{state.STATS.CACHE_MISSES}", 
+                tag="cache_stats"
+            )
+            dpg.add_text(
+                f"Chunks Resident/Loaded: {state.STATS.CHUNKS_RESIDENT}/{state.STATS.CHUNKS_LOADED}", 
+                tag="chunk_stats"
+            )
+            
+            dpg.add_text("Pipeline Stages:", tag="stage_stats")
+            dpg.add_text("Layer Memory:", tag="memory_stats")
+            
+            # Timing spans
+            dpg.add_checkbox(
+                label="Trace Spans",
+                default_value=config.TRACE_SPANS,
+                tag="trace_spans",
+                callback=self._toggle_span_tracing
+            )
+            dpg.add_button(
+                label="Export Trace",
+                callback=self._export_trace
+            )
+            dpg.add_text("Timing Spans: off", tag="span_stats")
             
             # Real-time performance
             dpg.add_text(
@@ -285,6 +352,26 @@ class StatisticsPanel:
                 f"FPS: {state.STATS.FPS}", 
                 tag="fps"
             )
+            dpg.add_text("Frame p50/p95/p99/max:", tag="frame_stats")
+            
+            # Frame time histogram, buckets relative to FRAME_BUDGET_MS
+            dpg.add_simple_plot(
+                histogram=True,
+                default_value=[0.0] * (len(FrameProfiler.BUDGET_MULTIPLES) + 1),
+                min_scale=0.0,
+                height=60,
+                tag="frame_hist"
+            )
+            edges = [f"{config.FRAME_BUDGET_MS * multiple:.0f}" for multiple in FrameProfiler.BUDGET_MULTIPLES]
+            dpg.add_text(f"Buckets (ms): <{' <'.join(edges)} >={edges[-1]}")
+    
+    def _toggle_span_tracing(self, sender, app_data):
+        """Turn timing span recording on or off."""
+        config.TRACE_SPANS = app_data
+    
+    def _export_trace(self):
+        """Write the recorded spans as Chrome trace JSON to the working directory."""
+        _span_tracer.export_chrome_trace(time.strftime("terrain_trace_%Y%m%d_%H%M%S.json"))
 
 
 class UIManager:
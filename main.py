@@ -1,5 +1,11 @@
-import logging
 import time
+# Taken before the remaining imports so the startup timing report covers them
+IMPORT_START = time.perf_counter()
+
+import argparse
+import logging
+import threading
+import numpy as np
 import pygame
 from pygame.locals import *
 import dearpygui.dearpygui as dpg
@@ -7,8 +13,14 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 
 import configuration as config
+from core.chunk_manager import ChunkManager
 from core.env_manager import _environment_manager
+from core.frame_profiler import FrameProfiler
+from core.mesh_export import export_terrain_mesh
+from core.startup import KernelWarmup, StartupTimer
 from core.terrain_generation import TerrainRenderer
+from core.terrain_worker import TerrainRegenerationWorker
+from core.tracing import _span_tracer
 import core.state as state
 from utility import UtilityManager
 
@@ -25,11 +37,18 @@ class TerrainApplication:
     """Manages the application lifecycle, rendering loop, and user interface
     interactions for real-time terrain generation and visualization."""
     
-    def __init__(self):
+    def __init__(self, startup_timer=None, exit_after_startup=False, trace_path=None):
         self.running = True
-        self.frame_times = []
+        self.frame_profiler = FrameProfiler()
         self.terrain_renderer = TerrainRenderer()
+        self.regeneration_worker = TerrainRegenerationWorker(self.terrain_renderer)
         self.utility_manager = UtilityManager()
+        self.chunk_manager = ChunkManager(self.terrain_renderer)
+        self.kernel_warmup = KernelWarmup()
+        self.startup_timer = startup_timer
+        self.exit_after_startup = exit_after_startup
+        self.trace_path = trace_path
+        self.camera_position = None
         self.normals = None
         self.biome_map = None
         
@@ -41,11 +60,41 @@ class TerrainApplication:
         terrain with default parameters.
         """
         logger.info("Initializing terrain generation application...")
+        if config.JIT_WARMUP:
+            # Compile kernels while the window and GUI are being created
+            self.kernel_warmup.start()
         _environment_manager.configure_environment()
-        self.normals, self.biome_map = self.terrain_renderer.regenerate_terrain()
+        self.mark_startup("context")
+        
+        # Generation would block on the same compilations anyway
+        self.kernel_warmup.wait()
+        self.mark_startup("jit wait")
+        
+        if config.CHUNKED_WORLD:
+            # Chunks stream in around the camera from the first frame on
+            view_extent = config.CHUNK_SIZE * (2 * config.CHUNK_VIEW_RADIUS + 1)
+            self.camera_position = np.array([0.0, config.ELEVATION_VIEW * view_extent, view_extent / 2])
+        else:
+            self.normals, self.biome_map = self.terrain_renderer.regenerate_terrain()
+        self.mark_startup("terrain")
         self.utility_manager.terrain_params_to_logger(on_start=True)
         logger.info("Application initialization complete")
         
+    def mark_startup(self, phase):
+        """Close a startup phase when startup timing is enabled."""
+        if self.startup_timer is not None:
+            self.startup_timer.mark(phase)
+    
+    def finish_startup(self):
+        """Report startup timing after the first frame. Returns False when
+        the application should exit (--startup-timing)."""
+        if self.startup_timer is None:
+            return True
+        self.startup_timer.mark("first frame")
+        self.startup_timer.report()
+        self.startup_timer = None
+        return not self.exit_after_startup
+        
     def handle_events(self):
         """Process pygame events and check for application termination."""
         for event in pygame.event.get():
@@ -55,42 +104,97 @@ class TerrainApplication:
         return True
         
     def update_terrain_if_needed(self):
-        """Regenerate terrain if user has requested updates through the UI."""
+        """Hand regeneration requests to the background worker and swap in
+        finished terrain. The current terrain keeps rendering meanwhile."""
         if state.TERRAIN_NEEDS_UPDATE and state.TERRAIN_REGEN_REQ:
+            logger.info("Regenerating terrain with new parameters...")
+            if config.CHUNKED_WORLD:
+                # Resident chunks are stale; they stream back in lazily
+                self.chunk_manager.clear()
+            else:
+                self.regeneration_worker.submit()
+            state.TERRAIN_NEEDS_UPDATE = False
+            state.TERRAIN_REGEN_REQ = False
+        
+        bundle = self.regeneration_worker.poll()
+        if bundle is not None:
             try:
-                logger.info("Regenerating terrain with new parameters...")
-                self.normals, self.biome_map = self.terrain_renderer.regenerate_terrain()
+                with _span_tracer.span("apply terrain"):
+                    self.normals, self.biome_map = self.terrain_renderer.apply_terrain_bundle(bundle)
                 self.utility_manager.terrain_params_to_logger(on_start=False)
             except Exception as e:
                 logger.error(f"Terrain regeneration failed: {e}")
-            finally:
-                state.TERRAIN_NEEDS_UPDATE = False
-                state.TERRAIN_REGEN_REQ = False
+    
+    def export_mesh_if_requested(self):
+        """Write the current terrain mesh when the UI asked for an export.
+        The file is written on a background thread; the exported arrays are
+        replaced, never modified, by later regenerations."""
+        path = state.MESH_EXPORT_REQ
+        if path is None:
+            return
+        state.MESH_EXPORT_REQ = None
+        if config.CHUNKED_WORLD or state.MESH is None:
+            logger.warning("Mesh export needs a fixed-map terrain; nothing to export")
+            return
+        threading.Thread(
+            target=self._export_mesh,
+            # Colors follow what is on screen: biome colors only when shown
+            args=(path, state.MESH, self.normals, self.biome_map if config.SIMULATE_BIOME else None),
+            name="mesh-export",
+            daemon=True
+        ).start()
+    
+    @staticmethod
+    def _export_mesh(path, mesh, normals, biome_map):
+        """Export thread body; failures are logged, not raised."""
+        try:
+            export_terrain_mesh(path, mesh, normals, biome_map)
+        except Exception as e:
+            logger.error(f"Mesh export to {path} failed: {e}")
                 
     def render_frame(self):
         """Render a single frame of the terrain visualization."""
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         
         render_start = time.perf_counter()
-        glPushMatrix()
-        self.terrain_renderer.render_terrain(self.normals, self.biome_map)
-        glPopMatrix()
+        if config.CHUNKED_WORLD:
+            self.render_chunked_world()
+        else:
+            glPushMatrix()
+            self.terrain_renderer.render_terrain(self.normals, self.biome_map)
+            glPopMatrix()
         
         # Update rendering performance statistics
         state.STATS.RENDER_TIME = (time.perf_counter() - render_start) * 1000
         
+    def update_world_camera(self):
+        """Move the chunked-world camera with WASD / arrow keys, scaled by
+        the last frame time, and load its view transform."""
+        keys = pygame.key.get_pressed()
+        step = config.CAMERA_SPEED * state.STATS.FRAME_TIME / 1000
+        self.camera_position[0] += step * ((keys[K_d] or keys[K_RIGHT]) - (keys[K_a] or keys[K_LEFT]))
+        self.camera_position[2] += step * ((keys[K_s] or keys[K_DOWN]) - (keys[K_w] or keys[K_UP]))
+        
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        glTranslatef(*(-self.camera_position))
+    
+    def render_chunked_world(self):
+        """Stream chunks around the point the camera looks at and draw them."""
+        self.update_world_camera()
+        
+        # The camera looks down -z, centred on the middle of the view area
+        view_extent = config.CHUNK_SIZE * (2 * config.CHUNK_VIEW_RADIUS + 1)
+        with _span_tracer.span("chunk update"):
+            self.chunk_manager.update(self.camera_position[0], self.camera_position[2] - view_extent / 2)
+        with _span_tracer.span("chunk render"):
+            self.chunk_manager.render()
+        
     def update_performance_stats(self, frame_start_time):
-        """Update frame timing and FPS statistics."""
+        """Update frame timing, percentile and FPS statistics."""
         state.STATS.FRAME_TIME = (time.perf_counter() - frame_start_time) * 1000
-        
-        # Maintain rolling average of frame times for smooth FPS calculation
-        self.frame_times.append(state.STATS.FRAME_TIME)
-        if len(self.frame_times) > 60:  # Keep last 60 frames
-            self.frame_times.pop(0)
-            
-        # Calculate FPS from average frame time
-        avg_frame_time = sum(self.frame_times) / len(self.frame_times)
-        state.STATS.FPS = 1000 / avg_frame_time if avg_frame_time > 0 else 0
+        self.frame_profiler.record(state.STATS.FRAME_TIME)
+        self.frame_profiler.update_stats()
 
         self.utility_manager.update_stats_display()
         
@@ -100,34 +204,66 @@ class TerrainApplication:
         
         while self.running:
             frame_start = time.perf_counter()
-            dpg.render_dearpygui_frame()
-            
-            # Process events and check for exit
-            if not self.handle_events():
-                break
+            with _span_tracer.span("frame"):
+                with _span_tracer.span("ui"):
+                    dpg.render_dearpygui_frame()
                 
-            # Update terrain if parameters changed
-            self.update_terrain_if_needed()
-            
-            # Render 3D scene
-            self.render_frame()
+                # Process events and check for exit
+                if not self.handle_events():
+                    break
+                    
+                # Update terrain if parameters changed
+                with _span_tracer.span("terrain update"):
+                    self.update_terrain_if_needed()
+                    self.export_mesh_if_requested()
+                
+                # Render 3D scene
+                with _span_tracer.span("render"):
+                    self.render_frame()
+                
+                # Update performance metrics
+                with _span_tracer.span("stats"):
+                    self.update_performance_stats(frame_start)
+                with _span_tracer.span("swap"):
+                    pygame.display.flip()
             
-            # Update performance metrics
-            self.update_performance_stats(frame_start)
-            pygame.display.flip()
+            if not self.finish_startup():
+                break
             
         logger.info("Application loop terminated")
         
     def cleanup(self):
         """Clean up resources and terminate the application gracefully."""
         logger.info("Cleaning up application resources...")
+        self.regeneration_worker.shutdown()
+        self.chunk_manager.release()
+        self.terrain_renderer.release()
+        if self.trace_path is not None:
+            _span_tracer.export_chrome_trace(self.trace_path)
         _environment_manager.cleanup_environment()
         logger.info("Application shutdown complete")
 
 
-def main():
+def main(argv=None):
     """ Application entry point. """
-    app = TerrainApplication()
+    parser = argparse.ArgumentParser(description="Real-time procedural terrain generation.")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="log import, context and first-frame times, then exit")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="record timing spans and write them to PATH as Chrome trace JSON on exit")
+    args = parser.parse_args(argv)
+    if args.trace:
+        config.TRACE_SPANS = True
+    
+    startup_timer = None
+    if args.startup_timing or config.STARTUP_TIMING:
+        startup_timer = StartupTimer(IMPORT_START)
+        startup_timer.mark("imports")
+    app = TerrainApplication(
+        startup_timer,
+        exit_after_startup=args.startup_timing,
+        trace_path=args.trace
+    )
     
     try:
         app.initialize()
@@ -1,4 +1,53 @@
+import numpy as np
+
 class Mesh:
+    """
+    Triangle mesh stored as contiguous NumPy arrays.
+
+    `vertices` is a float32 (N, 3) array of (x, y, z) positions and `indices`
+    a uint32 (M, 3) array of vertex indices, one row per triangle. Both are
+    laid out so they can be handed to OpenGL buffers without conversion.
+    """
     def __init__(self):
-        self.vertices = []
-        self.indices = []
\ No newline at end of file
+        self.vertices = np.empty((0, 3), dtype=np.float32)
+        self.indices = np.empty((0, 3), dtype=np.uint32)
+
+    @property
+    def vertex_count(self):
+        return self.vertices.shape[0]
+
+    @property
+    def triangle_count(self):
+        return self.indices.shape[0]
+
+    def build_grid(self, heightmap, height_scale, origin=(0, 0)):
+        """Triangulate a (width, depth) heightmap into two triangles per cell.
+        Vertex (x, z) lives at index x * depth + z, matching the normal map,
+        and is placed at world position origin + (x, z)."""
+        width, depth = heightmap.shape
+
+        # Vertex positions: x and z from the grid, y from scaled height
+        xs, zs = np.meshgrid(
+            np.arange(width, dtype=np.float32),
+            np.arange(depth, dtype=np.float32),
+            indexing="ij"
+        )
+        vertices = np.empty((width * depth, 3), dtype=np.float32)
+        vertices[:, 0] = xs.ravel() + origin[0]
+        vertices[:, 1] = (heightmap * height_scale).ravel()
+        vertices[:, 2] = zs.ravel() + origin[1]
+
+        # Corner indices for every quad of the grid
+        grid = np.arange(width * depth, dtype=np.uint32).reshape(width, depth)
+        top_left = grid[:-1, :-1].ravel()
+        top_right = grid[1:, :-1].ravel()
+        bottom_left = grid[:-1, 1:].ravel()
+        bottom_right = grid[1:, 1:].ravel()
+
+        # Two triangles per quad, interleaved in quad order
+        indices = np.empty((top_left.shape[0] * 2, 3), dtype=np.uint32)
+        indices[0::2] = np.column_stack((top_left, bottom_left, top_right))
+        indices[1::2] = np.column_stack((top_right, bottom_left, bottom_right))
+
+        self.vertices = vertices
+        self.indices = indices
@@ -7,6 +7,26 @@ class Stats:
         self.RENDER_TIME = 0.0    # GPU rendering time (ms)
         self.FRAME_TIME = 0.0     # Full frame time (ms)
         self.FPS = 0
+        self.FRAME_P50 = 0.0      # median frame time over the profiler window (ms)
+        self.FRAME_P95 = 0.0      # 95th percentile frame time (ms)
+        self.FRAME_P99 = 0.0      # 99th percentile frame time (ms)
+        self.FRAME_MAX = 0.0      # worst frame time in the window (ms)
+        self.FRAMES_OVER_BUDGET = 0 # frames in the window slower than FRAME_BUDGET_MS
+        self.FRAME_HISTOGRAM = [] # frame counts per budget-relative bucket
         self.TOTAL_D = 0.0
         self.TOTAL_E = 0.0
-        self.ERO_TIME = 0.0
\ No newline at end of file
+        self.ERO_TIME = 0.0
+        self.CACHE_HITS = 0       # terrain cache lookups served from memory/disk
+        self.CACHE_MISSES = 0     # terrain cache lookups that regenerated
+        self.LAYERS_REUSED = 0    # heightmap octave layers reused in the last build
+        self.LAYERS_GENERATED = 0 # heightmap octave layers evaluated in the last build
+        self.PATCHES_DRAWN = 0    # terrain patches (or chunks) inside the view frustum
+        self.PATCHES_CULLED = 0   # terrain patches (or chunks) skipped by frustum culling
+        self.CHUNKS_RESIDENT = 0  # chunks held in the chunked-world LRU
+        self.CHUNKS_LOADED = 0    # chunks generated since start
+        self.REGEN_QUEUE = 0      # regenerations running + waiting on the worker
+        self.REGEN_LATENCY = 0.0  # request to ready time of last regeneration (ms)
+        self.STAGE_TIMES = {}     # pipeline stage -> last run time (ms), None if skipped
+        self.STAGE_RUNS = {}      # pipeline stage -> times recomputed
+        self.STAGE_SKIPS = {}     # pipeline stage -> times reused from memo
+        self.LAYER_MEMORY = {}    # terrain layer -> bytes held (see TerrainRenderer.memory_report)
\ No newline at end of file
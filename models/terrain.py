@@ -1,7 +1,201 @@
-from noise import pnoise2
+import os
+import shutil
+import tempfile
 import numpy as np
 import configuration as config
 from utility import _utility_manager
+from core.erosion import erode_in_place_numba
+from core.noise_engine import fbm_noise2, generate_fbm_heightmap, heightmap_coordinates
+from core.precision import float_dtype, memory_report
+
+def compute_normal_map(heightmap, dtype=np.float64):
+    """
+    Compute unit surface normals for an arbitrary 2D heightmap.
+
+    Normals are derived from the heightmap gradient in a single vectorized
+    pass and returned as a (width * depth, 3) array in row-major cell order,
+    matching the mesh vertex layout. Pass dtype=np.float32 to halve memory.
+    Usable on eroded or imported heightmaps as well as generated ones.
+    """
+    dzdx, dzdy = np.gradient(heightmap)
+
+    # Normal from slope
+    normals = np.empty((heightmap.size, 3), dtype=dtype)
+    normals[:, 0] = -dzdx.ravel()
+    normals[:, 1] = 1.0
+    normals[:, 2] = -dzdy.ravel()
+    normals /= np.sqrt(np.einsum("ij,ij->i", normals, normals))[:, np.newaxis]
+    return normals
+
+def generate_climate_noise(width, depth, resolution=None, rows=None, dtype=np.float64):
+    """
+    Low-frequency Perlin field shared by the temperature and moisture maps
+    (3 octaves, frequency 3/min(width, depth), seeded with
+    HEIGHTMAP_BASE_SEED).
+
+    With a positive `resolution` (default CLIMATE_RESOLUTION) smaller than
+    the map, the field is evaluated on a coarse grid of at most that many
+    samples per axis spanning the same coordinates and bilinearly
+    upsampled, so its cost no longer grows with the heightmap size.
+    `rows` = (start, stop) returns only those rows of the field.
+    """
+    if resolution is None:
+        resolution = config.CLIMATE_RESOLUTION
+    frequency = 3.0 / min(width, depth)
+    row_start, row_stop = (0, width) if rows is None else rows
+
+    coarse_width = _climate_grid_size(width, resolution)
+    coarse_depth = _climate_grid_size(depth, resolution)
+    if coarse_width == width and coarse_depth == depth:
+        return fbm_noise2(
+            np.arange(row_start, row_stop, dtype=np.float64)[:, None] * frequency,
+            np.arange(depth, dtype=np.float64)[None, :] * frequency,
+            octaves=3,
+            base=config.HEIGHTMAP_BASE_SEED,
+            dtype=dtype
+        )
+
+    coarse = fbm_noise2(
+        np.linspace(0.0, width - 1, coarse_width)[:, None] * frequency,
+        np.linspace(0.0, depth - 1, coarse_depth)[None, :] * frequency,
+        octaves=3,
+        base=config.HEIGHTMAP_BASE_SEED,
+        dtype=dtype
+    )
+    return bilinear_upsample(coarse, width, depth, rows=rows)
+
+def _climate_grid_size(size, resolution):
+    """Samples along one axis for a climate resolution (0 = full)."""
+    if resolution <= 0 or resolution >= size:
+        return size
+    return max(int(resolution), 2)
+
+def bilinear_upsample(grid, width, depth, rows=None):
+    """Bilinearly resample a 2D grid whose samples span the same extent as
+    a (width, depth) grid, corner samples aligned, in the grid's dtype.
+    `rows` = (start, stop) limits the output to those rows."""
+    def axis_weights(coarse_size, size):
+        position = np.linspace(0.0, coarse_size - 1, size)
+        lower = np.minimum(position.astype(np.intp), coarse_size - 2)
+        return lower, (position - lower).astype(grid.dtype, copy=False)
+
+    x0, fx = axis_weights(grid.shape[0], width)
+    if rows is not None:
+        x0, fx = x0[rows[0]:rows[1]], fx[rows[0]:rows[1]]
+    z0, fz = axis_weights(grid.shape[1], depth)
+    # Interpolate along z for the two bracketing rows, then along x
+    rows = grid[:, z0] * (1.0 - fz) + grid[:, z0 + 1] * fz
+    return rows[x0] * (1.0 - fx)[:, None] + rows[x0 + 1] * fx[:, None]
+
+def temperature_from_noise(heightmap, climate_noise):
+    """Temperature in [0, 1] from the climate noise, cooled with altitude
+    and scaled by BIOME_TEMPERATURE."""
+    abs_height = (heightmap + 1) / 2
+    perlin_t = (climate_noise + 1.05) / 2.0  # range [0, 1]
+    calc_t = perlin_t * (1.0 - abs_height * 0.2) * config.BIOME_TEMPERATURE
+    return np.clip(calc_t, 0.0, 1.0)
+
+def moisture_from_noise(heightmap, climate_noise):
+    """Moisture in [0, 1] from the climate noise, dried with altitude and
+    offset by BIOME_MOISTURE."""
+    abs_height = (heightmap + 1) / 2
+    calc_m = climate_noise / 2.0 + config.BIOME_MOISTURE ** 2 - abs_height * 0.2 + 0.05
+    return np.clip(calc_m, 0.0, 1.0)
+
+def generate_climate_maps(heightmap, assign_biomes=False):
+    """
+    Fused climate stage: evaluate the shared climate noise once and derive
+    the temperature and moisture maps from it.
+
+    Returns (temperature_map, moisture_map), or (temperature_map,
+    moisture_map, biome_map) when `assign_biomes` is set.
+    """
+    climate_noise = generate_climate_noise(*heightmap.shape, dtype=heightmap.dtype)
+    temperature_map = temperature_from_noise(heightmap, climate_noise)
+    moisture_map = moisture_from_noise(heightmap, climate_noise)
+    if not assign_biomes:
+        return temperature_map, moisture_map
+    return temperature_map, moisture_map, _utility_manager.get_biome_ids(temperature_map, moisture_map)
+
+def generate_temperature_map(heightmap):
+    """Temperature for every cell of a heightmap. Prefer
+    generate_climate_maps when the moisture map is needed as well."""
+    return temperature_from_noise(heightmap, generate_climate_noise(*heightmap.shape, dtype=heightmap.dtype))
+
+def generate_moisture_map(heightmap):
+    """Moisture for every cell of a heightmap. Prefer
+    generate_climate_maps when the temperature map is needed as well."""
+    return moisture_from_noise(heightmap, generate_climate_noise(*heightmap.shape, dtype=heightmap.dtype))
+
+def climate_accuracy_report(heightmap, resolution=None):
+    """
+    Compare coarse-grid climate fields against a full-resolution
+    evaluation for the same heightmap.
+
+    Returns max/mean absolute error of the temperature and moisture maps
+    and the fraction of cells whose biome changes.
+    """
+    if resolution is None:
+        resolution = config.CLIMATE_RESOLUTION
+    width, depth = heightmap.shape
+    exact_noise = generate_climate_noise(width, depth, resolution=0, dtype=heightmap.dtype)
+    coarse_noise = generate_climate_noise(width, depth, resolution=resolution, dtype=heightmap.dtype)
+
+    report = {"resolution": resolution}
+    exact_maps = []
+    coarse_maps = []
+    for name, derive in (("temperature", temperature_from_noise), ("moisture", moisture_from_noise)):
+        exact = derive(heightmap, exact_noise)
+        coarse = derive(heightmap, coarse_noise)
+        error = np.abs(coarse - exact)
+        report[f"{name}_max_error"] = float(error.max())
+        report[f"{name}_mean_error"] = float(error.mean())
+        exact_maps.append(exact)
+        coarse_maps.append(coarse)
+
+    exact_biomes = _utility_manager.get_biome_ids(*exact_maps)
+    coarse_biomes = _utility_manager.get_biome_ids(*coarse_maps)
+    report["biome_mismatch"] = float(np.mean(exact_biomes != coarse_biomes))
+    return report
+
+def generate_world_heightmap(x0, z0, width, depth, dtype=np.float64):
+    """
+    Sample the fBm heightmap over world cells [x0, x0 + width) x
+    [z0, z0 + depth).
+
+    Noise is addressed by absolute world cell, with the feature size of the
+    fixed map (HEIGHTMAP_WIDTH/DEPTH cells per HEIGHTMAP_SCALE noise units),
+    so tiles sampled separately agree wherever they overlap and the
+    window at the origin equals the fixed map.
+    """
+    nx = np.arange(x0, x0 + width, dtype=np.float64) / config.HEIGHTMAP_WIDTH * config.HEIGHTMAP_SCALE
+    nz = np.arange(z0, z0 + depth, dtype=np.float64) / config.HEIGHTMAP_DEPTH * config.HEIGHTMAP_SCALE
+    return fbm_noise2(
+        nx[:, np.newaxis], nz[np.newaxis, :],
+        octaves=config.HEIGHTMAP_OCTAVES,
+        persistence=config.HEIGHTMAP_PERSISTENCE,
+        lacunarity=config.HEIGHTMAP_LACUNARITY,
+        base=config.HEIGHTMAP_BASE_SEED,
+        dtype=dtype
+    )
+
+def generate_world_climate_maps(heightmap, x0, z0, assign_biomes=False):
+    """World-space counterpart of generate_climate_maps for a heightmap
+    tile whose first cell is world cell (x0, z0)."""
+    width, depth = heightmap.shape
+    frequency = 3.0 / min(config.HEIGHTMAP_WIDTH, config.HEIGHTMAP_DEPTH)
+    climate_noise = fbm_noise2(
+        np.arange(x0, x0 + width, dtype=np.float64)[:, None] * frequency,
+        np.arange(z0, z0 + depth, dtype=np.float64)[None, :] * frequency,
+        octaves=3,
+        base=config.HEIGHTMAP_BASE_SEED,
+        dtype=heightmap.dtype
+    )
+    temperature_map = temperature_from_noise(heightmap, climate_noise)
+    moisture_map = moisture_from_noise(heightmap, climate_noise)
+    if not assign_biomes:
+        return temperature_map, moisture_map
+    return temperature_map, moisture_map, _utility_manager.get_biome_ids(temperature_map, moisture_map)
 
 class Terrain:
     """
@@ -11,69 +205,75 @@ class Terrain:
     
     The terrain system uses multiple noise layers to create natural-looking variations
     in elevation, climate, and ecosystem distribution across a 2D grid.
+    Float layers use the PRECISION dtype; with DROP_CLIMATE_MAPS the
+    temperature and moisture maps are released once biomes are assigned.
     """
     def __init__(self):
         self.width = config.HEIGHTMAP_WIDTH
         self.depth = config.HEIGHTMAP_DEPTH
         self.scale = config.HEIGHTMAP_SCALE
+        self.dtype = float_dtype()
 
-        self.heightmap = np.zeros((self.width, self.depth))
-        self.normal_map = np.zeros((self.width * self.depth, 3), dtype=np.float64)
-        self.moisture_map = np.zeros((self.width, self.depth))
-        self.temperature_map = np.zeros((self.width, self.depth))
-        self.biome_map = np.full((self.width, self.depth), "", dtype=object)
+        self.heightmap = np.zeros((self.width, self.depth), dtype=self.dtype)
+        self.normal_map = np.zeros((self.width * self.depth, 3), dtype=self.dtype)
+        self.moisture_map = np.zeros((self.width, self.depth), dtype=self.dtype)
+        self.temperature_map = np.zeros((self.width, self.depth), dtype=self.dtype)
+        self.biome_map = np.zeros((self.width, self.depth), dtype=np.uint8)
 
         self._setup()
 
     def _setup(self):
         self._generateHeightmap()
-        self._generateTemperatureMap()
-        self._generateMoistureMap()
-        self._assignBiomes()
+        self._generateClimate()
+        if config.DROP_CLIMATE_MAPS:
+            self.drop_climate_maps()
+
+    def drop_climate_maps(self):
+        """Release the temperature and moisture maps; only the biome map
+        derived from them is kept."""
+        self.temperature_map = None
+        self.moisture_map = None
+
+    def memory_report(self):
+        """Bytes held by each layer (0 once dropped); see core.precision."""
+        return memory_report({
+            "heightmap": self.heightmap,
+            "normal_map": self.normal_map,
+            "temperature_map": self.temperature_map,
+            "moisture_map": self.moisture_map,
+            "biome_map": self.biome_map,
+        })
     
     def _computeNormals(self):
         """Calculate surface normal vectors for each point on the heightmap using
         gradient analysis. These normals are essential for realistic lighting
         and shading effects in 3D rendering."""
-        index = 0
-        dzdx, dzdy = np.gradient(self.heightmap)
-
-        for x in range(self.width):
-            for z in range(self.depth):
-                # Normal from slope
-                nx = -dzdx[x][z]
-                ny = 1.0
-                nz = -dzdy[x][z]
-                normal = np.array([nx, ny, nz])
-                normal /= np.linalg.norm(normal)
-                self.normal_map[index] = normal
-                index+=1
+        self.normal_map = compute_normal_map(self.heightmap, dtype=self.normal_map.dtype)
 
     def _generateHeightmap(self):
-        """Generate the base terrain heightmap using multi-octave Perlin noise"""
-        for x in range(self.width):
-            for z in range(self.depth):
-                nx = x / self.width * self.scale
-                nz = z / self.depth * self.scale
-                self.heightmap[x][z] = pnoise2(nx, nz, 
-                                        octaves = config.HEIGHTMAP_OCTAVES, 
-                                        persistence = config.HEIGHTMAP_PERSISTENCE,
-                                        lacunarity = config.HEIGHTMAP_LACUNARITY, 
-                                        base = config.HEIGHTMAP_BASE_SEED)
+        """Generate the base terrain heightmap using multi-octave Perlin noise.
+        The whole grid is evaluated in one batched call that reproduces
+        pnoise2 output (see core.noise_engine.PNOISE2_TOLERANCE)."""
+        self.heightmap = generate_fbm_heightmap(
+            self.width, self.depth, self.scale,
+            octaves = config.HEIGHTMAP_OCTAVES,
+            persistence = config.HEIGHTMAP_PERSISTENCE,
+            lacunarity = config.HEIGHTMAP_LACUNARITY,
+            base = config.HEIGHTMAP_BASE_SEED,
+            dtype = self.dtype
+        )
         self._computeNormals()
     
+    def _generateClimate(self):
+        """Generate the temperature and moisture maps from a single shared
+        climate-noise evaluation and assign biomes in the same pass."""
+        self.temperature_map, self.moisture_map, self.biome_map = generate_climate_maps(
+            self.heightmap, assign_biomes=True
+        )
+
     def _generateTemperatureMap(self):
         """Generate a temperature map influenced by both Perlin noise and elevation."""
-        frequency = 3.0 / min(self.width, self.depth)
-        for x in range(self.width):
-            for z in range(self.depth):
-                nx = x * frequency
-                nz = z * frequency
-                perlin_t = (pnoise2(nx, nz, octaves=3, base=config.HEIGHTMAP_BASE_SEED) + 1.05) / 2.0  # range [0, 1]
-                abs_height = (self.heightmap[x][z] + 1) / 2
-                calc_t = perlin_t * (1.0 - abs_height * 0.2) * config.BIOME_TEMPERATURE
-
-                self.temperature_map[x][z] = np.clip(calc_t, 0.0, 1.0)
+        self.temperature_map = generate_temperature_map(self.heightmap)
 
         # plt.imshow(self.temperature_map, cmap="plasma", origin="lower")
         # plt.colorbar(label="Temperature")
@@ -81,25 +281,227 @@ class Terrain:
 
     def _generateMoistureMap(self):
         """Generate a moisture/humidity map based on Perlin noise and elevation effects."""
-        frequency = 3.0 / min(self.width, self.depth)
-        for x in range(self.width):
-            for z in range(self.depth):
-                nx = x * frequency
-                nz = z * frequency
-                perlin_m = pnoise2(nx, nz, octaves=3, base=config.HEIGHTMAP_BASE_SEED)
-                abs_height = (self.heightmap[x][z] + 1) / 2
-                calc_m = perlin_m  / 2.0 + config.BIOME_MOISTURE ** 2 - abs_height * 0.2 + 0.05
-                self.moisture_map[x][z] = np.clip(calc_m, 0.0, 1.0)
+        self.moisture_map = generate_moisture_map(self.heightmap)
 
         # plt.imshow(self.moisture_map, cmap="viridis", origin="lower")
         # plt.colorbar(label="Moisture Level")
         # plt.show()
 
+    @property
+    def biome_names(self):
+        """Biome map as biome name strings, for debugging and inspection."""
+        return _utility_manager.get_biome_names(self.biome_map)
+
     def _assignBiomes(self):
         """Assign appropriate biome types to each terrain cell based on temperature
-        and moisture conditions."""
-        for x in range(self.width):
-            for z in range(self.depth):
-                t = self.temperature_map[x][z]
-                m = self.moisture_map[x][z]
-                self.biome_map[x][z] = _utility_manager.get_biome(t,m)
\ No newline at end of file
+        and moisture conditions. Biomes are stored as uint8 IDs indexing
+        BiomeClassifier.BIOME_NAMES."""
+        self.biome_map = _utility_manager.get_biome_ids(self.temperature_map, self.moisture_map)
+
+class TiledTerrain(Terrain):
+    """
+    Out-of-core Terrain whose layers live in np.memmap-backed .npy files.
+
+    Generation, normals, climate and biome assignment stream over tiles of
+    whole rows, each mapped only while it is processed, so peak resident
+    memory is set by OUT_OF_CORE_TILE_MB rather than by the map size. The
+    layers match those of Terrain cell for cell. Files are written to
+    `directory` (default: OUT_OF_CORE_DIR, or a new temporary directory)
+    and can be reopened later with np.load(path, mmap_mode="r"). With
+    DROP_CLIMATE_MAPS the temperature and moisture files are never written.
+    """
+
+    # Layer name -> (dtype, components); None is the PRECISION dtype
+    LAYERS = {
+        "heightmap": (None, 1),
+        "normal_map": (None, 3),
+        "temperature_map": (None, 1),
+        "moisture_map": (None, 1),
+        "biome_map": (np.uint8, 1),
+    }
+    CLIMATE_LAYERS = ("temperature_map", "moisture_map")
+    # Working memory per cell of one tile: noise coordinates, gradients,
+    # normals, climate fields and biome masks
+    TILE_BYTES_PER_CELL = 128
+
+    def __init__(self, directory=None, tile_mb=None):
+        self.width = config.HEIGHTMAP_WIDTH
+        self.depth = config.HEIGHTMAP_DEPTH
+        self.scale = config.HEIGHTMAP_SCALE
+        self.dtype = float_dtype()
+
+        tile_mb = config.OUT_OF_CORE_TILE_MB if tile_mb is None else tile_mb
+        self.tile_rows = max(1, int(tile_mb * 1024 * 1024 // (self.depth * self.TILE_BYTES_PER_CELL)))
+
+        directory = config.OUT_OF_CORE_DIR if directory is None else directory
+        self.owns_directory = directory is None
+        if self.owns_directory:
+            directory = tempfile.mkdtemp(prefix="terrain_")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+        self.layer_names = [
+            name for name in self.LAYERS
+            if not (config.DROP_CLIMATE_MAPS and name in self.CLIMATE_LAYERS)
+        ]
+        for name in self.layer_names:
+            dtype, components = self.LAYERS[name]
+            shape = (self.width * self.depth, 3) if components == 3 else (self.width, self.depth)
+            np.lib.format.open_memmap(
+                self.layer_path(name), mode="w+", dtype=dtype or self.dtype, shape=shape
+            ).flush()
+
+        self._setup()
+
+    def _setup(self):
+        self._generateHeightmap()
+        self._generateClimate()
+        self._open_layers()
+
+    def drop_climate_maps(self):
+        """Delete the temperature and moisture files."""
+        for name in self.CLIMATE_LAYERS:
+            setattr(self, name, None)
+            if name in self.layer_names:
+                self.layer_names.remove(name)
+                os.remove(self.layer_path(name))
+
+    def layer_path(self, name):
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def open_layer(self, name, mode="r"):
+        """Map one layer file; "r+" for writing."""
+        return np.load(self.layer_path(name), mmap_mode=mode)
+
+    def _open_layers(self):
+        """Expose every layer as a read-only memmap attribute (None when
+        dropped)."""
+        for name in self.LAYERS:
+            setattr(self, name, self.open_layer(name) if name in self.layer_names else None)
+
+    def tiles(self):
+        """(start, stop) row ranges of the tiles covering the map."""
+        for start in range(0, self.width, self.tile_rows):
+            yield start, min(start + self.tile_rows, self.width)
+
+    def _write_tile(self, name, start, stop, values):
+        """Write rows [start, stop) of a layer and unmap it again, so the
+        tile's pages do not stay resident. Dropped layers are skipped."""
+        if name not in self.layer_names:
+            return
+        layer = self.open_layer(name, "r+")
+        if self.LAYERS[name][1] == 3:
+            start, stop = start * self.depth, stop * self.depth
+        layer[start:stop] = values
+        layer.flush()
+        del layer
+
+    def _read_tile(self, name, start, stop):
+        """Copy rows [start, stop) of a 2D layer into memory."""
+        return np.array(self.open_layer(name)[start:stop])
+
+    def _computeNormals(self):
+        """Stream surface normals over tiles. Each tile is read with one
+        halo row on either side so gradients match the whole-map result."""
+        for start, stop in self.tiles():
+            halo_start = max(start - 1, 0)
+            halo_stop = min(stop + 1, self.width)
+            normals = compute_normal_map(
+                self._read_tile("heightmap", halo_start, halo_stop), dtype=self.dtype
+            )
+            offset = (start - halo_start) * self.depth
+            self._write_tile("normal_map", start, stop, normals[offset:offset + (stop - start) * self.depth])
+
+    def _generateHeightmap(self):
+        """Evaluate the fBm heightmap tile by tile, then its normals."""
+        nx, nz = heightmap_coordinates(self.width, self.depth, self.scale)
+        for start, stop in self.tiles():
+            self._write_tile("heightmap", start, stop, fbm_noise2(
+                nx[start:stop], nz,
+                octaves = config.HEIGHTMAP_OCTAVES,
+                persistence = config.HEIGHTMAP_PERSISTENCE,
+                lacunarity = config.HEIGHTMAP_LACUNARITY,
+                base = config.HEIGHTMAP_BASE_SEED,
+                dtype = self.dtype
+            ))
+        self._computeNormals()
+
+    def _generateClimate(self):
+        """Stream temperature, moisture and biomes over tiles, evaluating
+        the shared climate noise once per tile."""
+        for start, stop in self.tiles():
+            heightmap = self._read_tile("heightmap", start, stop)
+            climate_noise = generate_climate_noise(
+                self.width, self.depth, rows=(start, stop), dtype=self.dtype
+            )
+            temperature_map = temperature_from_noise(heightmap, climate_noise)
+            moisture_map = moisture_from_noise(heightmap, climate_noise)
+            self._write_tile("temperature_map", start, stop, temperature_map)
+            self._write_tile("moisture_map", start, stop, moisture_map)
+            self._write_tile(
+                "biome_map", start, stop, _utility_manager.get_biome_ids(temperature_map, moisture_map)
+            )
+
+    def _generateClimateLayer(self, name, derive):
+        """Stream one climate layer, derived from the heightmap and climate noise."""
+        for start, stop in self.tiles():
+            climate_noise = generate_climate_noise(
+                self.width, self.depth, rows=(start, stop), dtype=self.dtype
+            )
+            self._write_tile(name, start, stop, derive(self._read_tile("heightmap", start, stop), climate_noise))
+
+    def _generateTemperatureMap(self):
+        """Stream the temperature map over tiles."""
+        self._generateClimateLayer("temperature_map", temperature_from_noise)
+
+    def _generateMoistureMap(self):
+        """Stream the moisture map over tiles."""
+        self._generateClimateLayer("moisture_map", moisture_from_noise)
+
+    def _assignBiomes(self):
+        """Stream biome assignment over tiles of the climate maps."""
+        for start, stop in self.tiles():
+            self._write_tile("biome_map", start, stop, _utility_manager.get_biome_ids(
+                self._read_tile("temperature_map", start, stop),
+                self._read_tile("moisture_map", start, stop)
+            ))
+
+    def erode(self):
+        """
+        Erode the heightmap file in place with the serial droplet kernel,
+        seeded like core.erosion.erode_heightmap, and recompute the normals.
+        The parallel kernel is never used here since its per-batch delta
+        maps would add one map-sized layer per worker. The result therefore
+        matches an in-memory Terrain eroded with EROSION_PARALLEL off.
+        Droplets wander over the whole map, so unlike the tiled stages this
+        touches every page of the heightmap; they are file-backed and the
+        OS may evict them under pressure.
+        Returns (total_deposited, total_eroded).
+        """
+        heightmap = self.open_layer("heightmap", "r+")
+        totals = erode_in_place_numba(
+            heightmap, config.EROSION_ITERATIONS, config.EROSION_INIT_VELOCITY,
+            config.HEIGHTMAP_BASE_SEED
+        )
+        heightmap.flush()
+        del heightmap
+        self._computeNormals()
+        self._open_layers()
+        return totals
+
+    @property
+    def nbytes(self):
+        """Total size of the layer files in bytes."""
+        return sum(os.path.getsize(self.layer_path(name)) for name in self.layer_names)
+
+    def remove(self):
+        """Delete the layer files, and the directory if it was created here."""
+        for name in self.LAYERS:
+            setattr(self, name, None)
+        if self.owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+        for name in self.layer_names:
+            path = self.layer_path(name)
+            if os.path.exists(path):
+                os.remove(path)
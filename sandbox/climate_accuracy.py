@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import configuration as config
+from core.noise_engine import generate_fbm_heightmap
+from models.terrain import climate_accuracy_report, generate_climate_maps
+
+# Coarse-grid climate fields vs. full-resolution evaluation
+MAP_SIZES = (128, 512, 1024)
+RESOLUTIONS = (0, 32, 64, 128)
+SEED = 1
+config.BIOME_TEMPERATURE = 0.5
+config.BIOME_MOISTURE = 0.5
+
+def best_of(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+for size in MAP_SIZES:
+    heightmap = generate_fbm_heightmap(size, size, 10, 3, 0.5, 2.0, SEED)
+    print(f"\nMap: {size}x{size}")
+    for resolution in RESOLUTIONS:
+        config.CLIMATE_RESOLUTION = resolution
+        elapsed = best_of(lambda: generate_climate_maps(heightmap))
+        report = climate_accuracy_report(heightmap, resolution)
+        print(f"  resolution={resolution:<4} {elapsed:7.1f}ms  "
+              f"temperature max/mean: {report['temperature_max_error']:.4f}/{report['temperature_mean_error']:.5f}  "
+              f"moisture max/mean: {report['moisture_max_error']:.4f}/{report['moisture_mean_error']:.5f}  "
+              f"biome mismatch: {report['biome_mismatch']:.2%}")
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import numba
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.noise_engine import generate_fbm_heightmap
+from core.erosion import (
+    simulate_hydraulic_erosion_numba,
+    simulate_hydraulic_erosion_parallel_numba,
+)
+
+# Serial vs. parallel hydraulic erosion speedup at every thread count
+RESOLUTION = 512
+ITERATIONS = (100000, 1000000)
+SEED = 1
+
+heightmap = generate_fbm_heightmap(RESOLUTION, RESOLUTION, 10, 3, 0.5, 2.0, SEED)
+max_threads = numba.config.NUMBA_NUM_THREADS
+print(f"Resolution: {RESOLUTION}x{RESOLUTION} | Cores available: {max_threads}")
+
+def best_of(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+# Compile both kernels before timing
+simulate_hydraulic_erosion_numba(heightmap, 1000, 0.5)
+simulate_hydraulic_erosion_parallel_numba(heightmap, 1000, 0.5, SEED, 1, 8)
+
+for iterations in ITERATIONS:
+    serial_ms = best_of(lambda: simulate_hydraulic_erosion_numba(heightmap, iterations, 0.5))
+    print(f"\nIterations: {iterations:,} | serial: {serial_ms:.1f}ms")
+
+    threads = 1
+    while threads <= max_threads:
+        numba.set_num_threads(threads)
+        parallel_ms = best_of(lambda: simulate_hydraulic_erosion_parallel_numba(
+            heightmap, iterations, 0.5, SEED, threads, 8
+        ))
+        print(f"  threads={threads:<3} parallel: {parallel_ms:8.1f}ms  "
+              f"speedup: {serial_ms / parallel_ms:5.2f}x")
+        threads *= 2
+
+# Same seed and worker count must reproduce the same terrain
+first = simulate_hydraulic_erosion_parallel_numba(heightmap, 100000, 0.5, SEED, 4, 8)[0]
+second = simulate_hydraulic_erosion_parallel_numba(heightmap, 100000, 0.5, SEED, 4, 8)[0]
+print(f"\nReproducible: {np.array_equal(first, second)}")
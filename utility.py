@@ -1,8 +1,10 @@
 import logging
-import dearpygui.dearpygui as dpg
 import configuration as config
 import core.state as state
 import numpy as np
+from core.precision import format_memory_report
+from core.terrain_pipeline import stage_statistics
+from core.tracing import _span_tracer
 
 logger = logging.getLogger("TERRAIN")
 
@@ -10,10 +12,17 @@ class BiomeClassifier:
     """
     Handles biome classification based on temperature and moisture values.
     
-    Provides methods for determining biome types and retrieving appropriate
-    colors for terrain rendering based on environmental conditions.
+    Biome maps are stored as compact uint8 IDs indexing BIOME_NAMES; colors
+    are resolved through a (num_biomes, 3) lookup table so a whole map is
+    colored with a single fancy-index operation.
     """
     
+    BIOME_NAMES = (
+        "TUNDRA", "TAIGA", "TEMPERATE", "GRASSLAND",
+        "DESERT", "SAVANNA", "RAINFOREST"
+    )
+    BIOME_IDS = {name: biome_id for biome_id, name in enumerate(BIOME_NAMES)}
+    
     @staticmethod
     def get_biome(temperature, moisture):
         """Classify biome based on temperature and moisture levels."""
@@ -32,6 +41,45 @@ class BiomeClassifier:
             else:
                 return "TEMPERATE"
     
+    @staticmethod
+    def get_biome_ids(temperature_map, moisture_map):
+        """Classify whole temperature and moisture maps into uint8 biome IDs
+        using the same thresholds as get_biome."""
+        ids = BiomeClassifier.BIOME_IDS
+        cold = temperature_map < 0.3
+        hot = temperature_map > 0.7
+        temperate = ~cold & ~hot
+        
+        biome_ids = np.full(temperature_map.shape, ids["TEMPERATE"], dtype=np.uint8)
+        biome_ids[cold & (moisture_map < 0.4)] = ids["TUNDRA"]
+        biome_ids[cold & ~(moisture_map < 0.4)] = ids["TAIGA"]
+        biome_ids[hot] = ids["SAVANNA"]
+        biome_ids[hot & (moisture_map < 0.2)] = ids["DESERT"]
+        biome_ids[hot & ~(moisture_map < 0.2) & (moisture_map > 0.8)] = ids["RAINFOREST"]
+        biome_ids[temperate & (moisture_map < 0.3)] = ids["GRASSLAND"]
+        return biome_ids
+    
+    @staticmethod
+    def get_biome_names(biome_ids):
+        """String view of a biome ID map, mainly for debugging."""
+        return np.array(BiomeClassifier.BIOME_NAMES, dtype=object)[biome_ids]
+    
+    @staticmethod
+    def get_biome_color_lut(default_color=(128, 128, 128), dtype=np.float64):
+        """Build the (num_biomes, 3) color lookup table indexed by biome ID."""
+        return np.array(
+            [config.BIOME_COLORS.get(name, default_color) 
+             for name in BiomeClassifier.BIOME_NAMES],
+            dtype=dtype
+        )
+    
+    @staticmethod
+    def get_biome_colors(biome_map, default_color=(128, 128, 128), dtype=np.float64):
+        """Get the biome color of every cell as a flat (N, 3) array in
+        vertex order (row-major over the biome map)."""
+        lut = BiomeClassifier.get_biome_color_lut(default_color, dtype)
+        return lut[biome_map.ravel()]
+    
     @staticmethod
     def get_biome_color_from_vertex(vertex, biome_map, 
                                   default_color=(128, 128, 128), 
@@ -43,7 +91,7 @@ class BiomeClassifier:
         
         # Check bounds and retrieve biome color
         if 0 <= i < biome_map.shape[0] and 0 <= j < biome_map.shape[1]:
-            biome = biome_map[i][j]
+            biome = BiomeClassifier.BIOME_NAMES[biome_map[i][j]]
             return config.BIOME_COLORS.get(biome, default_color)
         else:
             return error_color
@@ -84,9 +132,10 @@ class StatisticsManager:
     @staticmethod
     def output_erosion_statistics():
         """Output erosion simulation statistics to console."""
-        print(f"PARTICLES_DEPOSITED: {state.STATS.TOTAL_D}")
-        print(f"PARTICLES_ERODED: {state.STATS.TOTAL_E}")
-        print(f"EROSION_TIME: {round(state.STATS.ERO_TIME, 3)}ms")
+        logger.info(
+            f"Erosion: deposited {state.STATS.TOTAL_D:.4f} | "
+            f"eroded {state.STATS.TOTAL_E:.4f} | {state.STATS.ERO_TIME:.3f}ms"
+        )
     
     @staticmethod
     def reset_erosion_statistics():
@@ -118,18 +167,92 @@ class StatisticsManager:
             f"\033[32mTmp\033[0m={round(config.BIOME_TEMPERATURE, 3)} "
         )
     
+    @staticmethod
+    def format_stage_statistics():
+        """Format per-stage pipeline timings and run/skip counts."""
+        times, runs, skips = stage_statistics()
+        lines = []
+        for name, elapsed in times.items():
+            last = "skipped" if elapsed is None else f"{elapsed:.1f}ms"
+            lines.append(
+                f"  {name}: {last} "
+                f"(runs {runs.get(name, 0)}, "
+                f"skips {skips.get(name, 0)})"
+            )
+        return "Pipeline Stages:\n" + "\n".join(lines)
+    
+    @staticmethod
+    def format_memory_statistics():
+        """Format the bytes held per terrain layer and the float precision."""
+        if not state.STATS.LAYER_MEMORY:
+            return f"Layer Memory ({config.PRECISION}):"
+        return (
+            f"Layer Memory ({config.PRECISION}):\n" 
+            + format_memory_report(state.STATS.LAYER_MEMORY)
+        )
+    
+    @staticmethod
+    def format_span_statistics():
+        """Format the span breakdown of the last regeneration and frame."""
+        if not config.TRACE_SPANS:
+            return "Timing Spans: off"
+        breakdowns = [
+            _span_tracer.format_breakdown(name) for name in ("regenerate", "frame")
+        ]
+        return "Timing Spans:\n" + "\n".join(text for text in breakdowns if text)
+    
     @staticmethod
     def update_stats_display():
         """Update the DearPyGUI statistics display with current performance data."""
+        # Imported here so headless users of this module never load the GUI
+        import dearpygui.dearpygui as dpg
+        
         # Performance Metrics
         dpg.set_value("frame_time", f"Frame Time: {state.STATS.FRAME_TIME:.1f}ms")
         dpg.set_value("fps", f"FPS: {state.STATS.FPS:.0f}")
+        dpg.set_value(
+            "frame_stats", 
+            f"Frame p50/p95/p99/max: {state.STATS.FRAME_P50:.1f}/{state.STATS.FRAME_P95:.1f}/"
+            f"{state.STATS.FRAME_P99:.1f}/{state.STATS.FRAME_MAX:.1f}ms | "
+            f"Over Budget: {state.STATS.FRAMES_OVER_BUDGET}"
+        )
+        dpg.set_value("frame_hist", [float(count) for count in state.STATS.FRAME_HISTOGRAM])
         dpg.set_value("gen_time", f"Generation Time: {state.STATS.GEN_TIME:.1f}ms")
         dpg.set_value("render_time", f"Rendering Time: {state.STATS.RENDER_TIME:.1f}ms")
         
         # Mesh Statistics
         dpg.set_value("tri_count", f"Triangles: {state.STATS.TRIANGLE_COUNT:,}")
         dpg.set_value("vert_count", f"Vertices: {state.STATS.VERTEX_COUNT:,}")
+        dpg.set_value(
+            "patch_stats", 
+            f"Patches Drawn/Culled: {state.STATS.PATCHES_DRAWN}/{state.STATS.PATCHES_CULLED}"
+        )
+        
+        # Background regeneration
+        dpg.set_value(
+            "regen_stats", 
+            f"Regen Queue: {state.STATS.REGEN_QUEUE} | "
+            f"Latency: {state.STATS.REGEN_LATENCY:.1f}ms"
+        )
+        
+        # Pipeline stages
+        dpg.set_value("stage_stats", StatisticsManager.format_stage_statistics())
+        dpg.set_value("memory_stats", StatisticsManager.format_memory_statistics())
+        dpg.set_value("span_stats", StatisticsManager.format_span_statistics())
+        
+        # Terrain cache
+        dpg.set_value(
+            "cache_stats", 
+            f"Cache Hits/Misses: {state.STATS.CACHE_HITS}/{state.STATS.CACHE_MISSES} | "
+            f"Octaves Reused: {state.STATS.LAYERS_REUSED}/"
+            f"{state.STATS.LAYERS_REUSED + state.STATS.LAYERS_GENERATED}"
+        )
+        
+        # Chunked world
+        dpg.set_value(
+            "chunk_stats", 
+            f"Chunks Resident/Loaded: {state.STATS.CHUNKS_RESIDENT}/{state.STATS.CHUNKS_LOADED}"
+        )
 
 class UtilityManager:
     """
@@ -148,6 +271,18 @@ class UtilityManager:
         """Classify biome based on temperature and moisture."""
         return self.biome_classifier.get_biome(temperature, moisture)
     
+    def get_biome_ids(self, temperature_map, moisture_map):
+        """Classify whole climate maps into uint8 biome IDs."""
+        return self.biome_classifier.get_biome_ids(temperature_map, moisture_map)
+    
+    def get_biome_names(self, biome_ids):
+        """String view of a biome ID map."""
+        return self.biome_classifier.get_biome_names(biome_ids)
+    
+    def get_biome_color_lut(self, default_color=(128, 128, 128), dtype=np.float64):
+        """Color lookup table indexed by biome ID."""
+        return self.biome_classifier.get_biome_color_lut(default_color, dtype)
+    
     def get_biome_color_from_vertex(self, vertex, biome_map, 
                                   default_color=(128, 128, 128), 
                                   error_color=(255, 0, 0)):
@@ -156,6 +291,10 @@ class UtilityManager:
             vertex, biome_map, default_color, error_color
         )
     
+    def get_biome_colors(self, biome_map, default_color=(128, 128, 128), dtype=np.float64):
+        """Get per-vertex biome colors for a whole biome map."""
+        return self.biome_classifier.get_biome_colors(biome_map, default_color, dtype)
+    
     def get_camera_eye_pos(self, width, depth, elevation_view):
         """Calculate camera eye position."""
         return self.camera_manager.get_camera_eye_pos(width, depth, elevation_view)